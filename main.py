@@ -4,47 +4,82 @@ Main entry point for the AI Personal Assistant.
 
 import asyncio
 import sys
+import threading
 from pathlib import Path
 
 # Add src to path for imports
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from src.core.agent import PersonalAssistant
-from src.core.memory import MemoryManager
-from src.graphs.workflow import AssistantWorkflow
-from src.core.config import settings
+from src.utils.early_input import start_capturing_early_input, read_input_async
+
+
+def _report_workflow_test(task: asyncio.Task):
+    """Print the outcome of the background workflow test.
+    
+    Args:
+        task: The completed workflow test task
+    """
+    if task.cancelled():
+        return
+    
+    if task.exception() is not None:
+        print(f"\n❌ Workflow test failed!\nError: {task.exception()}")
+        return
+    
+    test_result = task.result()
+    if test_result["workflow_functional"]:
+        print("\n✅ Workflow test passed!")
+    else:
+        print("\n❌ Workflow test failed!")
+        print(f"Error: {test_result['result'].get('error', 'Unknown error')}")
 
 
 async def main():
     """Main application function."""
+    # Buffer anything the user types while the heavy components load
+    start_capturing_early_input()
+    
     print("🤖 AI Personal Assistant")
     print("=" * 50)
     
     try:
-        # Initialize components
-        print("Initializing AI Assistant...")
-        assistant = PersonalAssistant()
+        # Import heavy components only after the banner is on screen
+        from src.core.agent import PersonalAssistant
+        from src.core.memory import get_memory_manager
+        from src.graphs.workflow import AssistantWorkflow
+        from src.core.config import settings, configure_performance_environment
+        from src.core.llm import get_llm
+        
+        # Embedding thread counts must be set before the model loads
+        configure_performance_environment()
+        
+        # Load the memory store and LLM client concurrently so model loads overlap
+        print("Initializing Memory Manager and LLM client...")
+        memory_manager, _ = await asyncio.gather(
+            asyncio.to_thread(get_memory_manager, settings.memory_persist_dir),
+            asyncio.to_thread(get_llm)
+        )
         
-        print("Initializing Memory Manager...")
-        memory_manager = MemoryManager(settings.memory_persist_dir)
+        # All components share the single memory manager
+        print("Initializing AI Assistant and Workflow...")
+        assistant = PersonalAssistant(memory_manager=memory_manager)
+        workflow = AssistantWorkflow(assistant=assistant)
         
-        print("Initializing Workflow...")
-        workflow = AssistantWorkflow()
+        # Warm the embedding model and vector index used for chat before the first message
+        threading.Thread(
+            target=lambda: memory_manager.search_memory("warmup", n_results=1),
+            daemon=True
+        ).start()
         
         print("✅ All components initialized successfully!")
         print(f"📁 Memory directory: {settings.memory_persist_dir}")
         print(f"🤖 Model: {settings.model_name}")
         print(f"🌡️ Temperature: {settings.temperature}")
         
-        # Test the workflow
-        print("\n🧪 Testing workflow...")
-        test_result = await workflow.run_workflow_test()
-        
-        if test_result["workflow_functional"]:
-            print("✅ Workflow test passed!")
-        else:
-            print("❌ Workflow test failed!")
-            print(f"Error: {test_result['result'].get('error', 'Unknown error')}")
+        # Test the workflow in the background while the prompt is shown
+        print("\n🧪 Testing workflow in the background...")
+        workflow_test = asyncio.create_task(workflow.run_workflow_test())
+        workflow_test.add_done_callback(_report_workflow_test)
         
         # Interactive chat loop
         print("\n💬 Starting interactive chat...")
@@ -52,7 +87,8 @@ async def main():
         
         while True:
             try:
-                user_input = input("\n👤 You: ").strip()
+                # Wait for input without blocking background tasks; Ctrl-C cancels the wait
+                user_input = (await read_input_async("\n👤 You: ")).strip()
                 
                 if user_input.lower() == 'quit':
                     print("👋 Goodbye!")
@@ -69,15 +105,12 @@ async def main():
                 elif user_input:
                     print("🤖 Assistant: ", end="", flush=True)
                     
-                    # Process message using workflow
-                    result = await workflow.process_message(user_input)
-                    
-                    if result["success"]:
-                        print(result["response"])
-                    else:
-                        print(f"Error: {result.get('error', 'Unknown error')}")
+                    # Process message using workflow, printing the reply as it streams in
+                    async for chunk in workflow.process_message_stream(user_input):
+                        print(chunk, end="", flush=True)
+                    print()
                 
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
                 print("\n👋 Goodbye!")
                 break
             except Exception as e:
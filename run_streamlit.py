@@ -6,7 +6,6 @@ This script ensures proper Python path setup for imports.
 
 import sys
 import os
-import subprocess
 from pathlib import Path
 
 def main():
@@ -36,13 +35,12 @@ def main():
     
     print(f"Running Streamlit app: {streamlit_app_path}")
     
-    # Use subprocess to run streamlit
+    # Run streamlit in this process instead of spawning a second interpreter
     try:
-        result = subprocess.run([
-            sys.executable, "-m", "streamlit", "run", 
-            str(streamlit_app_path)
-        ], cwd=project_root)
-        return result.returncode
+        from streamlit.web import bootstrap
+        
+        bootstrap.run(str(streamlit_app_path), False, [], {})
+        return 0
     except KeyboardInterrupt:
         print("\nStreamlit app stopped by user")
         return 0
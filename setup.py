@@ -41,19 +41,28 @@ setup(
         "langgraph>=0.0.20",
         "langchain-community>=0.0.10",
         "groq>=0.4.2",
-        "chromadb>=0.4.22",
+        "chromadb>=0.5.0",
+        "diskcache>=5.6.0",
         "sentence-transformers>=2.2.2",
-        "streamlit>=1.29.0",
+        "streamlit>=1.37.0",
         "streamlit-chat>=0.1.1",
         "pydantic>=2.5.0",
+        "orjson>=3.9.0",
         "python-dotenv>=1.0.0",
         "numpy>=1.24.3",
         "pandas>=2.0.3",
     ],
     extras_require={
+        "tokens": [
+            "tiktoken>=0.5.0",
+        ],
+        "uvloop": [
+            "uvloop>=0.19.0; sys_platform != 'win32'",
+        ],
         "dev": [
             "pytest>=7.4.3",
-            "pytest-asyncio>=0.21.1",
+            "pytest-asyncio>=0.24.0",
+            "pytest-xdist>=3.5.0",
             "black>=23.11.0",
             "flake8>=6.1.0",
             "mypy>=1.7.1",
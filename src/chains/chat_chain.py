@@ -2,32 +2,15 @@
 Enhanced chat chain implementation using LangChain.
 """
 
-from typing import List, Dict, Any, Optional
-from langchain_core.runnables import RunnablePassthrough
-from langchain_core.prompts import PromptTemplate
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_groq import ChatGroq
+from functools import cached_property, lru_cache
+from typing import AsyncGenerator, List, Dict, Any, Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
 from ..core.config import settings
+from ..core.llm import get_llm
 
 
-class ChatChain:
-    """Enhanced chat chain with memory and context management."""
-    
-    def __init__(self):
-        """Initialize the chat chain."""
-        # Initialize Groq LLM
-        self.llm = ChatGroq(
-            groq_api_key=settings.groq_api_key,
-            model_name=settings.model_name,
-            temperature=settings.temperature,
-            max_tokens=settings.max_tokens
-        )
-        
-        # Create different prompt templates for different use cases
-        self.chat_prompt = PromptTemplate(
-            input_variables=["context", "history", "input"],
-            template="""You are a helpful AI assistant. Use the following context and conversation history to provide a helpful response.
+_CHAT_TEMPLATE = """You are a helpful AI assistant. Use the following context and conversation history to provide a helpful response.
 
 Context: {context}
 
@@ -36,53 +19,108 @@ Conversation History:
 
 Human: {input}
 Assistant:"""
-        )
-        
-        self.analysis_prompt = PromptTemplate(
-            input_variables=["context", "input"],
-            template="""Analyze the following information and provide insights:
+
+_ANALYSIS_TEMPLATE = """Analyze the following information and provide insights:
 
 Context: {context}
 
 Information to analyze: {input}
 
 Analysis:"""
-        )
-        
-        self.summary_prompt = PromptTemplate(
-            input_variables=["content"],
-            template="""Summarize the following content in a clear and concise way:
+
+_SUMMARY_TEMPLATE = """Summarize the following content in a clear and concise way:
 
 {content}
 
 Summary:"""
-        )
+
+
+@lru_cache(maxsize=None)
+def _make_template(template: str):
+    """Build a prompt template, reusing it for every ChatChain.
+    
+    Args:
+        template: Template string with {variable} placeholders
         
-        # Create chains using the new pattern
-        self.chat_chain = self.chat_prompt | self.llm
-        self.analysis_chain = self.analysis_prompt | self.llm
-        self.summary_chain = self.summary_prompt | self.llm
+    Returns:
+        PromptTemplate whose input variables are parsed from the string
+    """
+    # Heavy imports are deferred so light CLI paths don't pay for them
+    from langchain_core.prompts import PromptTemplate
     
-    def format_conversation_history(self, messages: List[BaseMessage]) -> str:
+    return PromptTemplate.from_template(template)
+
+
+class ChatChain:
+    """Enhanced chat chain with memory and context management."""
+    
+    # Number of most recent messages included in prompts
+    HISTORY_LIMIT = 10
+    
+    def __init__(self):
+        """Initialize the chat chain."""
+        # Shared Groq LLM
+        self.llm = get_llm()
+        
+        # Prompt templates for the different use cases, parsed once per process
+        self.chat_prompt = _make_template(_CHAT_TEMPLATE)
+        self.analysis_prompt = _make_template(_ANALYSIS_TEMPLATE)
+        self.summary_prompt = _make_template(_SUMMARY_TEMPLATE)
+    
+    # Chains are built on first use so callers that only chat never pay for the others
+    @cached_property
+    def chat_chain(self):
+        """Chat prompt piped into the LLM."""
+        return self.chat_prompt | self.llm
+    
+    @cached_property
+    def analysis_chain(self):
+        """Analysis prompt piped into the LLM."""
+        return self.analysis_prompt | self.llm
+    
+    @cached_property
+    def summary_chain(self):
+        """Summary prompt piped into the LLM."""
+        return self.summary_prompt | self.llm
+    
+    def format_conversation_history(self, messages: Optional[List[BaseMessage]]) -> str:
         """Format conversation history for prompt templates.
         
+        System and tool messages are not part of the transcript and are skipped.
+        
         Args:
-            messages: List of conversation messages
+            messages: List of conversation messages, or None for no history
             
         Returns:
             Formatted conversation history string
         """
-        if not messages:
-            return "No previous conversation."
-        
         formatted_history = []
-        for message in messages[-10:]:  # Keep last 10 messages
+        for message in (messages or [])[-self.HISTORY_LIMIT:]:  # Keep last 10 messages
             if isinstance(message, HumanMessage):
                 formatted_history.append(f"Human: {message.content}")
             elif isinstance(message, AIMessage):
                 formatted_history.append(f"Assistant: {message.content}")
         
-        return "\n".join(formatted_history)
+        return "\n".join(formatted_history) or "No previous conversation."
+    
+    async def _invoke(self, chain, inputs: Dict[str, Any], error_message: str) -> str:
+        """Invoke a chain and return its text output.
+        
+        Cancellation is not an Exception subclass, so it still propagates.
+        
+        Args:
+            chain: Runnable chain to invoke
+            inputs: Prompt variables for the chain
+            error_message: Apology prefix returned if the call fails
+            
+        Returns:
+            Chain output, or the error message on failure
+        """
+        try:
+            response = await chain.ainvoke(inputs)
+            return response.content
+        except Exception as e:
+            return f"{error_message}: {str(e)}"
     
     async def chat(
         self, 
@@ -95,24 +133,48 @@ Summary:"""
         Args:
             user_input: User's message
             context: Additional context information
-            history: Conversation history
+            history: Conversation history; None formats as "No previous conversation."
             
         Returns:
             Generated response
         """
-        try:
-            formatted_history = self.format_conversation_history(history or [])
-            
-            response = await self.chat_chain.ainvoke({
+        return await self._invoke(
+            self.chat_chain,
+            {
                 "context": context,
-                "history": formatted_history,
+                "history": self.format_conversation_history(history),
                 "input": user_input
-            })
-            
-            return response.content
+            },
+            "I apologize, but I encountered an error"
+        )
+    
+    async def stream_chat(
+        self,
+        user_input: str,
+        context: str = "",
+        history: List[BaseMessage] = None
+    ) -> AsyncGenerator[str, None]:
+        """Generate a chat response as a stream of text chunks.
+        
+        Args:
+            user_input: User's message
+            context: Additional context information
+            history: Conversation history; None formats as "No previous conversation."
             
+        Yields:
+            Response text chunks, or the error message if the call fails
+        """
+        inputs = {
+            "context": context,
+            "history": self.format_conversation_history(history),
+            "input": user_input
+        }
+        try:
+            async for chunk in self.chat_chain.astream(inputs):
+                if chunk.content:
+                    yield chunk.content
         except Exception as e:
-            return f"I apologize, but I encountered an error: {str(e)}"
+            yield f"I apologize, but I encountered an error: {str(e)}"
     
     async def analyze(self, content: str, context: str = "") -> str:
         """Analyze content and provide insights.
@@ -124,16 +186,11 @@ Summary:"""
         Returns:
             Analysis results
         """
-        try:
-            response = await self.analysis_chain.ainvoke({
-                "context": context,
-                "input": content
-            })
-            
-            return response.content
-            
-        except Exception as e:
-            return f"I apologize, but I encountered an error during analysis: {str(e)}"
+        return await self._invoke(
+            self.analysis_chain,
+            {"context": context, "input": content},
+            "I apologize, but I encountered an error during analysis"
+        )
     
     async def summarize(self, content: str) -> str:
         """Summarize content.
@@ -144,15 +201,11 @@ Summary:"""
         Returns:
             Summary
         """
-        try:
-            response = await self.summary_chain.ainvoke({
-                "content": content
-            })
-            
-            return response.content
-            
-        except Exception as e:
-            return f"I apologize, but I encountered an error during summarization: {str(e)}"
+        return await self._invoke(
+            self.summary_chain,
+            {"content": content},
+            "I apologize, but I encountered an error during summarization"
+        )
     
     def get_chain_info(self) -> Dict[str, Any]:
         """Get information about the available chains.
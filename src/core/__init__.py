@@ -3,7 +3,8 @@ Core components for the AI personal assistant.
 """
 
 from .agent import PersonalAssistant
-from .memory import MemoryManager
-from .config import Settings
+from .memory import MemoryManager, get_memory_manager
+from .config import Settings, get_settings
+from .llm import get_llm
 
-__all__ = ["PersonalAssistant", "MemoryManager", "Settings"]
+__all__ = ["PersonalAssistant", "MemoryManager", "get_memory_manager", "Settings", "get_settings", "get_llm"]
@@ -4,40 +4,108 @@ Enhanced with automatic conversation persistence and optimized context retrieval
 """
 
 import asyncio
-from datetime import datetime
-from typing import List, Dict, Any, Optional, AsyncGenerator
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Dict, Any, Optional, AsyncGenerator, Tuple, Union
 from pathlib import Path
 
-from langchain_groq import ChatGroq
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferWindowMemory
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 
-from .memory import MemoryManager
+from .memory import MemoryManager, get_memory_manager, _IMPORTANT_RE
 from .config import settings
+from .llm import get_llm
+
+
+# Long-term memory writes are batched so embeddings are computed together
+_WRITE_BATCH_SIZE = 16
+_WRITE_BATCH_WAIT = 2.0  # seconds
+
+# One writer per process; queued items carry the memory manager they target
+_PENDING_WRITES: "queue.Queue[Tuple[MemoryManager, str, str, float, Dict[str, Any]]]" = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_thread: Optional[threading.Thread] = None
+
+
+def _start_memory_writer():
+    """Start the process-wide memory writer thread if it is not running."""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None:
+            _writer_thread = threading.Thread(
+                target=_write_pending_memories,
+                name="memory-writer",
+                daemon=True
+            )
+            _writer_thread.start()
+
+
+def _write_pending_memories():
+    """Worker loop that drains queued writes into batched memory inserts."""
+    while True:
+        batch = [_PENDING_WRITES.get()]
+        deadline = time.monotonic() + _WRITE_BATCH_WAIT
+        
+        while len(batch) < _WRITE_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(_PENDING_WRITES.get(timeout=timeout))
+            except queue.Empty:
+                break
+        
+        # Group by target store so each manager gets a single insert
+        grouped: Dict[MemoryManager, List[Tuple[str, str, float, Dict[str, Any]]]] = {}
+        for memory_manager, *item in batch:
+            grouped.setdefault(memory_manager, []).append(tuple(item))
+        
+        for memory_manager, items in grouped.items():
+            try:
+                contents, memory_types, importance_scores, metadatas = zip(*items)
+                memory_manager.add_memories(
+                    contents=list(contents),
+                    memory_types=list(memory_types),
+                    metadatas=list(metadatas),
+                    importance_scores=list(importance_scores)
+                )
+            except Exception as e:
+                # Log error but don't fail the conversation
+                print(f"Warning: Failed to store memories: {e}")
+        
+        for _ in batch:
+            _PENDING_WRITES.task_done()
+
+
+def flush_pending_writes():
+    """Block until all queued long-term memory writes are stored."""
+    _PENDING_WRITES.join()
+
+
+# Make sure queued writes land before the interpreter exits
+atexit.register(flush_pending_writes)
 
 
 class PersonalAssistant:
     """Main personal assistant agent with memory and chat capabilities."""
     
-    def __init__(self):
-        """Initialize the personal assistant."""
-        # Initialize Groq LLM
-        self.llm = ChatGroq(
-            groq_api_key=settings.groq_api_key,
-            model_name=settings.model_name,
-            temperature=settings.temperature,
-            max_tokens=settings.max_tokens
-        )
+    def __init__(self, memory_manager: Optional[MemoryManager] = None):
+        """Initialize the personal assistant.
+        
+        Args:
+            memory_manager: Existing memory manager to share; the process-wide
+                manager for the configured directory is used when omitted
+        """
+        # Shared Groq LLM
+        self.llm = get_llm()
         
         # Initialize memory manager
-        self.memory_manager = MemoryManager(settings.memory_persist_dir)
+        self.memory_manager = memory_manager or get_memory_manager(settings.memory_persist_dir)
         
-        # Initialize conversation memory
-        self.conversation_memory = ConversationBufferWindowMemory(
-            k=10,  # Keep last 10 messages in conversation
-            return_messages=True
-        )
+        # Initialize conversation memory (last 10 exchanges)
+        self._chat_history: Deque[BaseMessage] = deque(maxlen=20)
         
         # System prompt
         self.system_prompt = """You are an intelligent and helpful personal AI assistant. 
@@ -54,19 +122,16 @@ class PersonalAssistant:
         {memory_context}
         """
         
-        # Initialize prompt template
-        self.prompt_template = ChatPromptTemplate.from_messages([
-            ("system", self.system_prompt),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("human", "{input}")
-        ])
+        # Plain system template; only {memory_context} varies per turn, so
+        # messages are assembled directly instead of via a prompt template engine
+        self._system_template = self.system_prompt
     
     async def chat(
         self, 
         user_input: str, 
         user_id: Optional[str] = None,
         stream: bool = False
-    ) -> str:
+    ) -> Union[str, AsyncGenerator[str, None]]:
         """Process a chat message from the user.
         
         Args:
@@ -75,24 +140,26 @@ class PersonalAssistant:
             stream: Whether to stream the response
             
         Returns:
-            The assistant's response
+            The assistant's response, or an async generator of response
+            chunks when streaming
         """
-        # Get optimized context from long-term memory
-        memory_context = self.memory_manager.get_optimized_context(
+        # Get optimized context from long-term memory off the event loop
+        memory_context_task = asyncio.create_task(asyncio.to_thread(
+            self.memory_manager.get_optimized_context,
             query=user_input,
             max_tokens=800,  # Reserve tokens for conversation and response
             n_results=8,     # Get more memories for better context
             include_summaries=True
-        )
+        ))
         
-        # Get conversation history
-        chat_history = self.conversation_memory.chat_memory.messages
+        # Get conversation history while the memory search runs
+        chat_history = list(self._chat_history)
         
         # Prepare prompt variables
         prompt_vars = {
             "input": user_input,
             "chat_history": chat_history,
-            "memory_context": memory_context
+            "memory_context": await memory_context_task
         }
         
         # Generate response
@@ -101,26 +168,40 @@ class PersonalAssistant:
         else:
             return await self._generate_response(prompt_vars)
     
+    def _build_messages(self, prompt_vars: Dict[str, Any]) -> List[BaseMessage]:
+        """Build the message list sent to the LLM.
+        
+        Args:
+            prompt_vars: Variables for the prompt
+            
+        Returns:
+            System message, chat history and the new human message
+        """
+        system_message = SystemMessage(
+            content=self._system_template.replace("{memory_context}", prompt_vars["memory_context"])
+        )
+        return [system_message, *prompt_vars["chat_history"], HumanMessage(content=prompt_vars["input"])]
+    
     async def _generate_response(self, prompt_vars: Dict[str, Any]) -> str:
         """Generate a response using the LLM.
         
         Args:
-            prompt_vars: Variables for the prompt template
+            prompt_vars: Variables for the prompt
             
         Returns:
             Generated response
         """
         try:
             # Format messages
-            messages = self.prompt_template.format_messages(**prompt_vars)
+            messages = self._build_messages(prompt_vars)
             
             # Generate response
             response = await self.llm.ainvoke(messages)
             response_content = response.content
             
             # Store in conversation memory
-            self.conversation_memory.chat_memory.add_user_message(prompt_vars["input"])
-            self.conversation_memory.chat_memory.add_ai_message(response_content)
+            self._chat_history.append(HumanMessage(content=prompt_vars["input"]))
+            self._chat_history.append(AIMessage(content=response_content))
             
             # Automatically persist conversation to long-term memory
             await self._persist_conversation(prompt_vars["input"], response_content)
@@ -134,23 +215,32 @@ class PersonalAssistant:
             error_msg = f"I apologize, but I encountered an error: {str(e)}"
             return error_msg
     
-    def _stream_response(self, prompt_vars: Dict[str, Any]) -> AsyncGenerator[str, None]:
+    async def _stream_response(self, prompt_vars: Dict[str, Any]) -> AsyncGenerator[str, None]:
         """Stream a response from the LLM.
         
         Args:
-            prompt_vars: Variables for the prompt template
+            prompt_vars: Variables for the prompt
             
         Yields:
             Response chunks
         """
         try:
             # Format messages
-            messages = self.prompt_template.format_messages(**prompt_vars)
+            messages = self._build_messages(prompt_vars)
             
-            # Stream response
-            for chunk in self.llm.stream(messages):
+            # Stream response without blocking the event loop between tokens
+            chunks = []
+            async for chunk in self.llm.astream(messages):
                 if chunk.content:
+                    chunks.append(chunk.content)
                     yield chunk.content
+            
+            # Record the completed exchange the same way as a non-streamed reply
+            response_content = "".join(chunks)
+            self._chat_history.append(HumanMessage(content=prompt_vars["input"]))
+            self._chat_history.append(AIMessage(content=response_content))
+            await self._persist_conversation(prompt_vars["input"], response_content)
+            await self._store_important_info(prompt_vars["input"], response_content)
                     
         except Exception as e:
             yield f"I apologize, but I encountered an error: {str(e)}"
@@ -163,20 +253,38 @@ class PersonalAssistant:
             response: The assistant's response
         """
         try:
-            # Add conversation to long-term memory
-            self.memory_manager.add_conversation_memory(
+            # Queue the conversation; embedding and the Chroma write happen off the loop
+            content, importance_score, metadata = self.memory_manager.build_conversation_memory(
                 user_input=user_input,
                 assistant_response=response,
                 metadata={
                     "source": "automatic_persistence",
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": time.time_ns(),
                     "auto_saved": True
                 }
             )
+            self._enqueue_memory_write(
+                content=content,
+                memory_type="conversation",
+                importance_score=importance_score,
+                metadata=metadata
+            )
         except Exception as e:
             # Log error but don't fail the conversation
             print(f"Warning: Failed to persist conversation: {e}")
     
+    @staticmethod
+    def _is_important(text: str) -> bool:
+        """Check whether a message contains an important-info keyword.
+        
+        Args:
+            text: The user's message
+            
+        Returns:
+            True if the message is worth storing as important info
+        """
+        return _IMPORTANT_RE.search(text) is not None
+    
     async def _store_important_info(self, user_input: str, response: str):
         """Store important information from the conversation in long-term memory.
         
@@ -184,29 +292,42 @@ class PersonalAssistant:
             user_input: The user's input
             response: The assistant's response
         """
-        # Simple heuristic to determine if information is worth storing
-        important_keywords = [
-            "remember", "important", "save", "note", "preference", 
-            "like", "dislike", "always", "never", "favorite",
-            "critical", "essential", "key", "vital", "crucial"
-        ]
-        
-        is_important = any(keyword in user_input.lower() for keyword in important_keywords)
-        
-        if is_important:
-            # Store the important information with high importance score
+        if self._is_important(user_input):
+            # Queue the important information with high importance score
             memory_content = f"User: {user_input}\nAssistant: {response}"
-            self.memory_manager.add_memory(
+            self._enqueue_memory_write(
                 content=memory_content,
                 memory_type="important_info",
                 importance_score=0.9,  # High importance for explicitly marked content
                 metadata={
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": time.time_ns(),
                     "source": "conversation",
                     "explicitly_important": True
                 }
             )
     
+    def _enqueue_memory_write(
+        self,
+        content: str,
+        memory_type: str,
+        importance_score: float,
+        metadata: Dict[str, Any]
+    ):
+        """Queue a long-term memory write for the batching worker.
+        
+        Args:
+            content: Content to remember
+            memory_type: Type of memory
+            importance_score: Importance score (0.0 to 1.0)
+            metadata: Additional metadata
+        """
+        _start_memory_writer()
+        _PENDING_WRITES.put((self.memory_manager, content, memory_type, importance_score, metadata))
+    
+    def flush_pending_writes(self):
+        """Block until all queued long-term memory writes are stored."""
+        flush_pending_writes()
+    
     def add_memory(
         self, 
         content: str, 
@@ -237,7 +358,8 @@ class PersonalAssistant:
         query: str, 
         n_results: int = 5,
         memory_type: Optional[str] = None,
-        min_importance: Optional[float] = None
+        min_importance: Optional[float] = None,
+        min_score: Optional[float] = None
     ) -> List[tuple]:
         """Search for relevant memories.
         
@@ -246,6 +368,7 @@ class PersonalAssistant:
             n_results: Number of results to return
             memory_type: Filter by memory type
             min_importance: Minimum importance score threshold
+            min_score: Minimum combined relevance score
             
         Returns:
             List of (content, similarity_score, metadata) tuples
@@ -254,7 +377,8 @@ class PersonalAssistant:
             query=query,
             n_results=n_results,
             memory_type=memory_type,
-            min_importance=min_importance
+            min_importance=min_importance,
+            min_score=min_score
         )
     
     def get_optimized_context(
@@ -292,7 +416,7 @@ class PersonalAssistant:
     
     def clear_conversation_memory(self):
         """Clear the current conversation memory."""
-        self.conversation_memory.clear()
+        self._chat_history.clear()
     
     def export_memories(self, filepath: Path) -> bool:
         """Export all memories to a file.
@@ -311,7 +435,7 @@ class PersonalAssistant:
         Returns:
             Conversation summary
         """
-        messages = self.conversation_memory.chat_memory.messages
+        messages = self._chat_history
         
         if not messages:
             return "No conversation history available."
@@ -320,14 +444,16 @@ class PersonalAssistant:
         user_messages = [msg.content for msg in messages if isinstance(msg, HumanMessage)]
         ai_messages = [msg.content for msg in messages if isinstance(msg, AIMessage)]
         
-        summary = f"Conversation Summary:\n"
-        summary += f"- User messages: {len(user_messages)}\n"
-        summary += f"- Assistant responses: {len(ai_messages)}\n"
+        summary_lines = [
+            "Conversation Summary:",
+            f"- User messages: {len(user_messages)}",
+            f"- Assistant responses: {len(ai_messages)}"
+        ]
         
         if user_messages:
-            summary += f"- Last user message: {user_messages[-1][:100]}...\n"
+            summary_lines.append(f"- Last user message: {user_messages[-1][:100]}...")
         
-        return summary
+        return "\n".join(summary_lines) + "\n"
     
     def get_memory_insights(self) -> Dict[str, Any]:
         """Get insights about the memory system and conversation patterns.
@@ -3,8 +3,9 @@ Configuration management for the AI personal assistant.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -36,6 +37,18 @@ class Settings(BaseSettings):
         default=5,
         env="MEMORY_MAX_RESULTS"
     )
+    memory_embedding_backend: str = Field(
+        default="torch",
+        env="MEMORY_EMBEDDING_BACKEND"  # "torch", "onnx" or "openvino"
+    )
+    memory_embedding_threads: int = Field(
+        default=0,
+        env="MEMORY_EMBEDDING_THREADS"  # 0 uses every CPU core
+    )
+    memory_backend: str = Field(
+        default="persistent",
+        env="MEMORY_BACKEND"  # "persistent" or "memory" (nothing written to disk)
+    )
     
     # Application Configuration
     debug: bool = Field(default=False, env="DEBUG")
@@ -55,12 +68,64 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
         extra="ignore"  # Allow extra fields from environment
     )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the process-wide settings, parsing the environment only once.
+    
+    The memory directory is created by MemoryManager when it is first used.
     
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Ensure memory directory exists
-        self.memory_persist_dir.mkdir(parents=True, exist_ok=True)
+    Returns:
+        Shared Settings instance
+    """
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
+
+
+def _embedding_threads() -> int:
+    """Intra-op thread count for embedding inference (MEMORY_EMBEDDING_THREADS or every core)."""
+    return settings.memory_embedding_threads or os.cpu_count() or 1
+
+
+@lru_cache(maxsize=None)
+def configure_performance_environment():
+    """Configure CPU threading for local embedding inference.
+    
+    Call once at application startup, before the embedding model loads;
+    repeated calls are no-ops. Uses every core for intra-op parallelism (or
+    MEMORY_EMBEDDING_THREADS) and a single inter-op thread, which suits small
+    batched encodes. Torch also runs pooling for the ONNX and OpenVINO
+    backends, whose own runtimes get the thread count from
+    embedding_model_kwargs.
+    """
+    import torch
+    
+    torch.set_num_threads(_embedding_threads())
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set once, before any inter-op parallel work has started
+        pass
+
+
+def embedding_model_kwargs() -> Dict[str, Any]:
+    """Build SentenceTransformer model_kwargs for the configured backend.
+    
+    Returns:
+        Runtime threading options for ONNX Runtime or OpenVINO; empty for torch
+    """
+    backend = settings.memory_embedding_backend
+    if backend == "onnx":
+        import onnxruntime
+        
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = _embedding_threads()
+        session_options.inter_op_num_threads = 1
+        return {"session_options": session_options}
+    if backend == "openvino":
+        return {"ov_config": {"INFERENCE_NUM_THREADS": str(_embedding_threads())}}
+    return {}
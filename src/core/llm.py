@@ -0,0 +1,28 @@
+"""
+Shared LLM client for the AI personal assistant.
+"""
+
+from functools import lru_cache
+
+from .config import settings
+
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """Get the process-wide Groq chat model.
+    
+    The client is created once so every component shares the same
+    HTTP connection pool.
+    
+    Returns:
+        Shared ChatGroq instance
+    """
+    # Deferred so light CLI paths don't pay for the import
+    from langchain_groq import ChatGroq
+    
+    return ChatGroq(
+        groq_api_key=settings.groq_api_key,
+        model_name=settings.model_name,
+        temperature=settings.temperature,
+        max_tokens=settings.max_tokens
+    )
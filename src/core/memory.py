@@ -3,21 +3,218 @@ Long-term memory system using ChromaDB for vector storage.
 Enhanced with conversation persistence and context optimization.
 """
 
-import json
+import hashlib
+import os
+import re
+import threading
+import time
 import uuid
+from collections import Counter, deque
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from functools import lru_cache
+from typing import TYPE_CHECKING, Deque, List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
-import chromadb
-from chromadb.config import Settings as ChromaSettings
-from sentence_transformers import SentenceTransformer
+import diskcache
+import numpy as np
+import orjson
 from langchain_core.documents import Document
 
+from .config import settings, embedding_model_kwargs
+
+# chromadb and sentence-transformers (torch) are imported on first use so that
+# importing this module, e.g. during test collection or CLI startup, stays cheap
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+def _word_regex(words: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Compile a case-insensitive whole-word matcher for a set of words.
+    
+    Plain inflections (-s, -es, -d, -ed, -ing) also match, so "likes" and
+    "remembered" count while "keyboard" does not match "key". The base word
+    is captured so findall reports each keyword once however it is inflected.
+    
+    Args:
+        words: Words or phrases to match
+        
+    Returns:
+        Compiled pattern
+    """
+    return re.compile(
+        r"\b(" + "|".join(map(re.escape, words)) + r")(?:e?s|e?d|ing)?\b",
+        re.IGNORECASE
+    )
+
+
+# Keywords that raise the importance score of a memory
+_IMPORTANT_KEYWORDS = (
+    "remember", "important", "save", "note", "preference",
+    "like", "dislike", "always", "never", "favorite",
+    "critical", "essential", "key", "vital", "crucial"
+)
+_IMPORTANT_RE = _word_regex(_IMPORTANT_KEYWORDS)
+
+# Phrases that mark a user message as a request for help or information;
+# matched by the same whole-word rule as the importance keywords
+_QUESTION_RE = _word_regex(("how", "what", "when", "where", "why", "can you", "help", "explain"))
+
+
+def _keyword_bonus(text: str) -> float:
+    """Score 0.1 for each distinct important keyword in the text.
+    
+    Args:
+        text: Text to scan
+        
+    Returns:
+        Keyword bonus
+    """
+    return 0.1 * len({match.lower() for match in _IMPORTANT_RE.findall(text)})
+
+
+# Metadata keys holding epoch-nanosecond timestamps
+_TIMESTAMP_KEYS = ("timestamp", "last_updated")
+
+
+def _to_ns(timestamp: datetime) -> int:
+    """Convert a datetime to integer epoch nanoseconds.
+    
+    Args:
+        timestamp: Datetime to convert
+        
+    Returns:
+        Nanoseconds since the epoch
+    """
+    return int(timestamp.timestamp()) * 1_000_000_000 + timestamp.microsecond * 1_000
+
+
+def _iso(ns: int) -> str:
+    """Format integer epoch nanoseconds as an ISO 8601 string.
+    
+    Args:
+        ns: Nanoseconds since the epoch
+        
+    Returns:
+        ISO 8601 timestamp
+    """
+    return datetime.fromtimestamp(ns / 1_000_000_000).isoformat()
+
+
+def _batch_uuids(n: int) -> List[str]:
+    """Generate time-ordered UUIDv7 strings from one random read.
+    
+    Args:
+        n: Number of ids to generate
+        
+    Returns:
+        List of UUID strings sharing the current millisecond timestamp
+    """
+    timestamp = (time.time_ns() // 1_000_000) << 80
+    random_bytes = os.urandom(10 * n)
+    ids = []
+    for i in range(n):
+        rand = int.from_bytes(random_bytes[i * 10:(i + 1) * 10], "big")
+        # 48-bit timestamp | version 7 | 12 random bits | variant 10 | 62 random bits
+        value = (
+            timestamp
+            | (0x7 << 76)
+            | ((rand >> 62) & 0xFFF) << 64
+            | (0b10 << 62)
+            | (rand & ((1 << 62) - 1))
+        )
+        ids.append(str(uuid.UUID(int=value)))
+    return ids
+
+
+@lru_cache(maxsize=1)
+def _get_token_encoding():
+    """Get the tiktoken encoding used for token counts, if available.
+    
+    Returns:
+        tiktoken encoding, or None when tiktoken is not installed or its
+        vocabulary cannot be loaded
+    """
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Count the tokens in a piece of text.
+    
+    Falls back to ~4 characters per token without tiktoken.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Token count
+    """
+    encoding = _get_token_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# Loaded embedding models, shared by every MemoryManager in the process
+_MODEL_CACHE: Dict[str, "SentenceTransformer"] = {}
+_MODEL_LOCK = threading.Lock()
+
+
+def _get_embedding_model(name: str) -> "SentenceTransformer":
+    """Get a shared embedding model, loading it on first use.
+    
+    Args:
+        name: Sentence-transformers model name
+        
+    Returns:
+        Loaded embedding model
+    """
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            
+            # Non-default backends (ONNX Runtime, OpenVINO) need sentence-transformers>=3.2
+            backend = settings.memory_embedding_backend
+            if backend == "torch":
+                model = SentenceTransformer(name)
+            else:
+                model = SentenceTransformer(
+                    name, backend=backend, model_kwargs=embedding_model_kwargs()
+                )
+            _MODEL_CACHE[name] = model
+        return model
+
 
 class MemoryManager:
     """Manages long-term memory using ChromaDB vector database."""
     
+    # Collection settings; HNSW parameters only take effect for new collections.
+    # Cosine space makes (1 - distance) a true cosine similarity, and the larger
+    # ef values trade a little build time for much better recall.
+    COLLECTION_METADATA = {
+        "description": "Long-term memory for AI assistant",
+        "hnsw:space": "cosine",
+        "hnsw:M": 16,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 100
+    }
+    
+    # Memories longer than this get a precomputed summary
+    SUMMARY_MIN_LENGTH = 200
+    
+    # Records fetched per page when exporting memories
+    EXPORT_PAGE_SIZE = 1000
+    
+    # Seconds that get_memory_stats results stay valid without writes
+    STATS_TTL = 5.0
+    # Cosine similarity at which a cached search is reused for a new query
+    SEMANTIC_CACHE_THRESHOLD = 0.97
+    
     def __init__(self, persist_directory: Path):
         """Initialize the memory manager.
         
@@ -28,22 +225,59 @@ class MemoryManager:
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
         # Initialize ChromaDB
-        self.client = chromadb.PersistentClient(
-            path=str(self.persist_directory),
-            settings=ChromaSettings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
+        import chromadb
+        from chromadb.config import Settings as ChromaSettings
+        
+        chroma_settings = ChromaSettings(
+            anonymized_telemetry=False,
+            allow_reset=False
         )
+        if settings.memory_backend == "memory":
+            # In-process store shared by every client; nothing is synced to disk
+            self.client = chromadb.EphemeralClient(settings=chroma_settings)
+        else:
+            self.client = chromadb.PersistentClient(
+                path=str(self.persist_directory),
+                settings=chroma_settings
+            )
         
         # Initialize embedding model
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.embedding_model_name = settings.memory_embedding_model
+        self.embedding_model = _get_embedding_model(self.embedding_model_name)
+        
+        # Only uncased models can share an embedding between "Python" and "python"
+        tokenizer = getattr(self.embedding_model, "tokenizer", None)
+        self._lowercase_queries = bool(getattr(tokenizer, "do_lower_case", False))
+        
+        # Persistent cache of query embeddings, shared across sessions; the
+        # in-memory backend keeps nothing on disk and relies on the LRU alone
+        self._embed_cache: Optional[diskcache.Cache] = None
+        if settings.memory_backend != "memory":
+            self._embed_cache = diskcache.Cache(str(self.persist_directory / "embed_cache"))
+        # In-process LRU in front of the disk cache for repeated queries
+        self._cached_encode = lru_cache(maxsize=1024)(self._encode_uncached)
         
         # Create or get collection
         self.collection = self.client.get_or_create_collection(
             name="assistant_memories",
-            metadata={"description": "Long-term memory for AI assistant"}
+            metadata=self.COLLECTION_METADATA
         )
+        
+        # Recent searches as (normalized query vector, search parameters, results),
+        # reused for near-duplicate queries and reset on every write
+        self._sem_cache: Deque[Tuple[np.ndarray, Tuple, List]] = deque(maxlen=256)
+        
+        # Short-lived cache for get_memory_stats, reset on every write
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_ts = 0.0
+        
+        # Stores written before timestamps became epoch nanoseconds hold ISO
+        # strings; convert them once so range filters and sorting see one type
+        if settings.memory_backend != "memory":
+            migrated_marker = self.persist_directory / ".timestamps_ns"
+            if not migrated_marker.exists():
+                self.backfill_timestamps()
+                migrated_marker.touch()
     
     def add_memory(
         self, 
@@ -65,34 +299,88 @@ class MemoryManager:
         Returns:
             Memory ID
         """
-        if timestamp is None:
-            timestamp = datetime.now()
+        return self.add_memories(
+            contents=[content],
+            memory_types=[memory_type],
+            metadatas=[metadata],
+            importance_scores=[importance_score],
+            timestamp=timestamp
+        )[0]
+    
+    def add_memories(
+        self,
+        contents: List[str],
+        memory_types: Optional[List[str]] = None,
+        metadatas: Optional[List[Optional[Dict[str, Any]]]] = None,
+        importance_scores: Optional[List[Optional[float]]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> List[str]:
+        """Add several memory entries using a single batched embedding pass.
         
-        # Generate embedding
-        embedding = self.embedding_model.encode(content).tolist()
+        Args:
+            contents: The contents to remember
+            memory_types: Type of each memory (defaults to conversation)
+            metadatas: Additional metadata for each memory
+            importance_scores: Importance score for each memory (0.0 to 1.0)
+            timestamp: When the memories were created
+            
+        Returns:
+            Memory IDs, in the same order as contents
+        """
+        if not contents:
+            return []
+        
+        count = len(contents)
+        memory_types = memory_types or ["conversation"] * count
+        metadatas = metadatas or [None] * count
+        importance_scores = importance_scores or [None] * count
+        timestamp_ns = _to_ns(timestamp) if timestamp is not None else time.time_ns()
+        
+        # Generate all embeddings in one batched forward pass, encoding repeated contents once
+        unique_contents = list(dict.fromkeys(contents))
+        unique_embeddings = self.embedding_model.encode(
+            unique_contents,
+            batch_size=32,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        if len(unique_contents) == count:
+            embeddings = unique_embeddings
+        else:
+            positions = {content: i for i, content in enumerate(unique_contents)}
+            embeddings = unique_embeddings[[positions[content] for content in contents]]
         
         # Prepare metadata
-        memory_metadata = {
-            "type": memory_type,
-            "timestamp": timestamp.isoformat(),
-            "content_length": len(content),
-            "importance_score": importance_score or self._calculate_importance_score(content, memory_type)
-        }
-        if metadata:
-            memory_metadata.update(metadata)
+        memory_metadatas = []
+        for content, memory_type, metadata, importance_score in zip(
+            contents, memory_types, metadatas, importance_scores
+        ):
+            memory_metadata = {
+                "type": memory_type,
+                "timestamp": timestamp_ns,
+                "content_length": len(content),
+                "importance_score": importance_score or self._calculate_importance_score(content, memory_type)
+            }
+            if len(content) > self.SUMMARY_MIN_LENGTH:
+                # Summarize once at write time instead of on every context build
+                memory_metadata["summary"] = self._summarize_content(content)
+            if metadata:
+                memory_metadata.update(metadata)
+            memory_metadatas.append(memory_metadata)
         
-        # Generate unique ID
-        memory_id = str(uuid.uuid4())
+        # Generate unique IDs
+        memory_ids = _batch_uuids(len(contents))
         
         # Add to collection
         self.collection.add(
-            embeddings=[embedding],
-            documents=[content],
-            metadatas=[memory_metadata],
-            ids=[memory_id]
+            embeddings=embeddings,
+            documents=list(contents),
+            metadatas=memory_metadatas,
+            ids=memory_ids
         )
+        self._invalidate_caches()
         
-        return memory_id
+        return memory_ids
     
     def add_conversation_memory(
         self,
@@ -112,6 +400,37 @@ class MemoryManager:
         Returns:
             Memory ID
         """
+        conversation_content, importance_score, conv_metadata = self.build_conversation_memory(
+            user_input, assistant_response, conversation_id, metadata
+        )
+        
+        return self.add_memory(
+            content=conversation_content,
+            memory_type="conversation",
+            metadata=conv_metadata,
+            importance_score=importance_score
+        )
+    
+    def build_conversation_memory(
+        self,
+        user_input: str,
+        assistant_response: str,
+        conversation_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, float, Dict[str, Any]]:
+        """Prepare a conversation exchange for storage without writing it.
+        
+        Lets callers batch the exchange with other memories via add_memories.
+        
+        Args:
+            user_input: User's message
+            assistant_response: Assistant's response
+            conversation_id: Optional conversation identifier
+            metadata: Additional metadata
+            
+        Returns:
+            Tuple of (content, importance_score, metadata)
+        """
         # Combine user input and assistant response
         conversation_content = f"User: {user_input}\nAssistant: {assistant_response}"
         
@@ -128,12 +447,49 @@ class MemoryManager:
         if metadata:
             conv_metadata.update(metadata)
         
-        return self.add_memory(
-            content=conversation_content,
-            memory_type="conversation",
-            metadata=conv_metadata,
-            importance_score=importance_score
+        return conversation_content, importance_score, conv_metadata
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        """Embed a search query, reusing cached embeddings when available.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Read-only float32 query embedding
+        """
+        normalized = query.strip()
+        if self._lowercase_queries:
+            normalized = normalized.lower()
+        return self._cached_encode(normalized)
+    
+    def _encode_uncached(self, normalized: str) -> np.ndarray:
+        """Embed a normalized query via the disk cache or the model.
+        
+        Args:
+            normalized: Stripped query, lowercased for uncased models
+            
+        Returns:
+            Read-only float32 query embedding
+        """
+        key = hashlib.blake2b(
+            f"{self.embedding_model_name}\0{normalized}".encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+        
+        cached = self._embed_cache.get(key) if self._embed_cache is not None else None
+        if cached is not None:
+            return np.frombuffer(cached, dtype=np.float32)
+        
+        embedding = np.asarray(
+            self.embedding_model.encode(normalized, convert_to_numpy=True),
+            dtype=np.float32
         )
+        if self._embed_cache is not None:
+            self._embed_cache.set(key, embedding.tobytes())
+        # Shared through the LRU cache, so guard against in-place edits
+        embedding.flags.writeable = False
+        return embedding
     
     def _calculate_importance_score(self, content: str, memory_type: str) -> float:
         """Calculate importance score for memory content.
@@ -159,14 +515,7 @@ class MemoryManager:
         base_score = type_scores.get(memory_type, base_score)
         
         # Content-based scoring
-        important_keywords = [
-            "remember", "important", "save", "note", "preference", 
-            "like", "dislike", "always", "never", "favorite",
-            "critical", "essential", "key", "vital", "crucial"
-        ]
-        
-        keyword_bonus = sum(0.1 for keyword in important_keywords if keyword.lower() in content.lower())
-        base_score = min(1.0, base_score + keyword_bonus)
+        base_score = min(1.0, base_score + _keyword_bonus(content))
         
         # Length-based scoring (very short or very long might be less important)
         if len(content) < 10:
@@ -189,18 +538,10 @@ class MemoryManager:
         base_score = 0.6
         
         # Check for important keywords in user input
-        important_keywords = [
-            "remember", "important", "save", "note", "preference", 
-            "like", "dislike", "always", "never", "favorite",
-            "critical", "essential", "key", "vital", "crucial"
-        ]
-        
-        keyword_bonus = sum(0.1 for keyword in important_keywords if keyword.lower() in user_input.lower())
-        base_score = min(1.0, base_score + keyword_bonus)
+        base_score = min(1.0, base_score + _keyword_bonus(user_input))
         
         # Check if user is asking for help or information
-        question_indicators = ["how", "what", "when", "where", "why", "can you", "help", "explain"]
-        if any(indicator in user_input.lower() for indicator in question_indicators):
+        if _QUESTION_RE.search(user_input) is not None:
             base_score += 0.1
         
         # Check response quality (longer, more detailed responses might indicate important topics)
@@ -215,7 +556,9 @@ class MemoryManager:
         n_results: int = 5,
         memory_type: Optional[str] = None,
         filter_metadata: Optional[Dict[str, Any]] = None,
-        min_importance: Optional[float] = None
+        min_importance: Optional[float] = None,
+        min_score: Optional[float] = None,
+        rerank: bool = True
     ) -> List[Tuple[str, float, Dict[str, Any]]]:
         """Search for relevant memories.
         
@@ -225,54 +568,127 @@ class MemoryManager:
             memory_type: Filter by memory type
             filter_metadata: Additional metadata filters
             min_importance: Minimum importance score threshold
+            min_score: Minimum combined score; weaker matches are dropped
+                before ranking
+            rerank: Re-rank candidates by similarity and importance; when
+                False, results keep Chroma's similarity order
             
         Returns:
             List of (content, similarity_score, metadata) tuples
         """
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode(query).tolist()
+        # Generate query embedding once; the normalized copy keys the semantic cache
+        query_embedding = self._encode_query(query)
+        query_vector = query_embedding / (np.linalg.norm(query_embedding) or 1.0)
+        
+        # Reuse results of a near-identical recent search with the same filters
+        search_params = (
+            n_results, memory_type, repr(filter_metadata), min_importance, min_score, rerank
+        )
+        cached_results = self._lookup_semantic_cache(query_vector, search_params)
+        if cached_results is not None:
+            return cached_results
         
-        # Prepare where clause for filtering
-        where_clause = {}
+        # Prepare where clause for filtering; Chroma needs $and for multiple conditions
+        conditions = []
         if memory_type:
-            where_clause["type"] = memory_type
+            conditions.append({"type": memory_type})
         if min_importance is not None:
-            where_clause["importance_score"] = {"$gte": min_importance}
+            conditions.append({"importance_score": {"$gte": min_importance}})
         if filter_metadata:
-            where_clause.update(filter_metadata)
+            conditions.extend({key: value} for key, value in filter_metadata.items())
+        if len(conditions) > 1:
+            where_clause = {"$and": conditions}
+        else:
+            where_clause = conditions[0] if conditions else None
         
-        # Search with higher n_results to allow for importance filtering
-        search_n = min(n_results * 2, 20)  # Get more results for better filtering
+        # Overfetch only when re-ranking can promote results past Chroma's top n
+        search_n = n_results * 3 if rerank else n_results
         
         # Search
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embedding[None, :],
             n_results=search_n,
-            where=where_clause if where_clause else None
+            where=where_clause
         )
         
-        # Format and score results
-        formatted_results = []
+        # Score results in one vectorized pass
+        top_results = []
         if results['documents'] and results['documents'][0]:
-            for i, (doc, metadata) in enumerate(zip(
-                results['documents'][0], 
-                results['metadatas'][0]
-            )):
-                # Calculate similarity score (1 - distance)
-                distance = results['distances'][0][i] if results['distances'] else 0
-                similarity = 1 - distance
-                
-                # Get importance score
-                importance = metadata.get('importance_score', 0.5)
-                
-                # Combine similarity and importance for final score
-                final_score = (similarity * 0.7) + (importance * 0.3)
-                
-                formatted_results.append((doc, final_score, metadata))
+            documents = results['documents'][0]
+            metadatas = results['metadatas'][0]
+            
+            # Calculate similarity score (1 - distance)
+            if results['distances']:
+                similarities = 1.0 - np.asarray(results['distances'][0], dtype=np.float64)
+            else:
+                similarities = np.ones(len(documents))
+            importances = np.fromiter(
+                (metadata.get('importance_score', 0.5) for metadata in metadatas),
+                dtype=np.float64,
+                count=len(metadatas)
+            )
+            
+            # Combine similarity and importance for final score
+            final_scores = (similarities * 0.7) + (importances * 0.3)
+            
+            # Keep results above min_score, then select the top n_results
+            order = np.arange(len(documents))
+            if min_score is not None:
+                order = order[final_scores >= min_score]
+            if rerank:
+                if len(order) > n_results:
+                    order = order[np.argpartition(-final_scores[order], n_results - 1)[:n_results]]
+                order = order[np.argsort(-final_scores[order], kind="stable")]
+            top_results = [
+                (documents[i], float(final_scores[i]), metadatas[i])
+                for i in order[:n_results]
+            ]
+        
+        # Callers may edit the metadata they get back, so the cache keeps its own copy
+        self._sem_cache.append((query_vector, search_params, self._copy_results(top_results)))
+        return top_results
+    
+    @staticmethod
+    def _copy_results(
+        results: List[Tuple[str, float, Dict[str, Any]]]
+    ) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """Copy search results so their metadata dicts are not shared.
+        
+        Args:
+            results: List of (content, score, metadata) tuples
+            
+        Returns:
+            New list with a shallow copy of each metadata dict
+        """
+        return [(content, score, dict(metadata)) for content, score, metadata in results]
+    
+    def _lookup_semantic_cache(
+        self,
+        query_vector: np.ndarray,
+        search_params: Tuple
+    ) -> Optional[List[Tuple[str, float, Dict[str, Any]]]]:
+        """Find cached results for a near-duplicate query.
+        
+        Args:
+            query_vector: L2-normalized query embedding
+            search_params: Search parameters the results must match
+            
+        Returns:
+            Copy of the cached results, or None on a miss
+        """
+        candidates = [
+            (vector, results) for vector, params, results in list(self._sem_cache)
+            if params == search_params
+        ]
+        if not candidates:
+            return None
         
-        # Sort by final score and return top n_results
-        formatted_results.sort(key=lambda x: x[1], reverse=True)
-        return formatted_results[:n_results]
+        # Vectors are normalized, so one matrix-vector product gives cosine similarities
+        similarities = np.stack([vector for vector, _ in candidates]) @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self.SEMANTIC_CACHE_THRESHOLD:
+            return self._copy_results(candidates[best][1])
+        return None
     
     def get_optimized_context(
         self,
@@ -299,19 +715,37 @@ class MemoryManager:
             min_importance=0.4  # Only include moderately important memories
         )
         
+        return self.build_context(memories, max_tokens, include_summaries)
+    
+    def build_context(
+        self,
+        memories: List[Tuple[str, float, Dict[str, Any]]],
+        max_tokens: int = 1000,
+        include_summaries: bool = True
+    ) -> str:
+        """Build a context string from search results within a token budget.
+        
+        Args:
+            memories: (content, score, metadata) tuples from search_memory
+            max_tokens: Maximum tokens for context
+            include_summaries: Whether to include memory summaries
+            
+        Returns:
+            Optimized context string
+        """
         if not memories:
             return ""
         
         # Sort by importance and relevance
-        memories.sort(key=lambda x: (x[2].get('importance_score', 0.5), x[1]), reverse=True)
+        memories = sorted(memories, key=lambda x: (x[2].get('importance_score', 0.5), x[1]), reverse=True)
         
         # Build optimized context
         context_parts = []
         current_tokens = 0
         
         for content, score, metadata in memories:
-            # Estimate tokens (rough approximation: 1 token ≈ 4 characters)
-            estimated_tokens = len(content) // 4
+            # Count tokens (memoized, so repeated context builds are cheap)
+            estimated_tokens = count_tokens(content)
             
             # Check if adding this memory would exceed token limit
             if current_tokens + estimated_tokens > max_tokens:
@@ -322,9 +756,9 @@ class MemoryManager:
             importance = metadata.get('importance_score', 0.5)
             timestamp = metadata.get('timestamp', '')
             
-            if include_summaries and len(content) > 200:
-                # Summarize long memories
-                summary = self._summarize_content(content)
+            if include_summaries and len(content) > self.SUMMARY_MIN_LENGTH:
+                # Summarize long memories, preferring the precomputed summary
+                summary = metadata.get('summary') or self._summarize_content(content)
                 formatted_memory = f"[{memory_type.upper()}] {summary} (Importance: {importance:.2f})"
             else:
                 formatted_memory = f"[{memory_type.upper()}] {content} (Importance: {importance:.2f})"
@@ -366,6 +800,76 @@ class MemoryManager:
         # Fallback: truncate and add ellipsis
         return content[:max_length-3] + "..."
     
+    def backfill_summaries(self) -> int:
+        """Store precomputed summaries for long memories that lack one.
+        
+        Returns:
+            Number of memories updated
+        """
+        updated = 0
+        total = self.collection.count()
+        for offset in range(0, total, self.EXPORT_PAGE_SIZE):
+            page = self.collection.get(
+                limit=self.EXPORT_PAGE_SIZE,
+                offset=offset,
+                include=["documents", "metadatas"]
+            )
+            
+            ids, metadatas = [], []
+            for memory_id, content, metadata in zip(
+                page['ids'], page['documents'], page['metadatas']
+            ):
+                if len(content) > self.SUMMARY_MIN_LENGTH and 'summary' not in metadata:
+                    ids.append(memory_id)
+                    metadatas.append({**metadata, "summary": self._summarize_content(content)})
+            
+            if ids:
+                self.collection.update(ids=ids, metadatas=metadatas)
+                updated += len(ids)
+        
+        if updated:
+            self._invalidate_caches()
+        return updated
+    
+    def backfill_timestamps(self) -> int:
+        """Convert ISO 8601 timestamp metadata to epoch nanoseconds.
+        
+        Values that are not valid ISO strings are left untouched.
+        
+        Returns:
+            Number of memories updated
+        """
+        updated = 0
+        total = self.collection.count()
+        for offset in range(0, total, self.EXPORT_PAGE_SIZE):
+            page = self.collection.get(
+                limit=self.EXPORT_PAGE_SIZE,
+                offset=offset,
+                include=["metadatas"]
+            )
+            
+            ids, metadatas = [], []
+            for memory_id, metadata in zip(page['ids'], page['metadatas']):
+                converted = {}
+                for key in _TIMESTAMP_KEYS:
+                    value = metadata.get(key)
+                    if isinstance(value, str):
+                        try:
+                            converted[key] = _to_ns(datetime.fromisoformat(value))
+                        except ValueError:
+                            pass
+                if converted:
+                    ids.append(memory_id)
+                    metadatas.append({**metadata, **converted})
+            
+            if ids:
+                self.collection.update(ids=ids, metadatas=metadatas)
+                updated += len(ids)
+        
+        if updated:
+            self._invalidate_caches()
+        return updated
+    
     def get_memory_by_id(self, memory_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
         """Retrieve a specific memory by ID.
         
@@ -406,22 +910,26 @@ class MemoryManager:
                 return False
             
             # Generate new embedding
-            embedding = self.embedding_model.encode(content).tolist()
+            embedding = self.embedding_model.encode(content, convert_to_numpy=True)
             
             # Prepare updated metadata
             updated_metadata = existing[1].copy()
-            updated_metadata["last_updated"] = datetime.now().isoformat()
+            updated_metadata["last_updated"] = time.time_ns()
             updated_metadata["content_length"] = len(content)
+            updated_metadata.pop("summary", None)
+            if len(content) > self.SUMMARY_MIN_LENGTH:
+                updated_metadata["summary"] = self._summarize_content(content)
             if metadata:
                 updated_metadata.update(metadata)
             
             # Update in collection
             self.collection.update(
                 ids=[memory_id],
-                embeddings=[embedding],
+                embeddings=embedding[None, :],
                 documents=[content],
                 metadatas=[updated_metadata]
             )
+            self._invalidate_caches()
             return True
             
         except Exception:
@@ -438,48 +946,75 @@ class MemoryManager:
         """
         try:
             self.collection.delete(ids=[memory_id])
+            self._invalidate_caches()
             return True
         except Exception:
             return False
     
+    def _invalidate_caches(self):
+        """Drop cached statistics and search results after a write."""
+        self._stats_cache = None
+        self._sem_cache.clear()
+    
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get statistics about the memory system.
         
+        Results are cached for STATS_TTL seconds since they rarely change
+        between repeated requests; any write resets the cache.
+        
         Returns:
             Dictionary with memory statistics
         """
+        if self._stats_cache is not None and time.monotonic() - self._stats_ts < self.STATS_TTL:
+            return self._stats_cache
+        
         try:
             count = self.collection.count()
             
-            # Get sample memories for analysis
-            sample = self.collection.get(limit=1000)
-            type_counts = {}
-            importance_scores = []
+            # Get sample metadata for analysis (documents and embeddings aren't needed)
+            sample = self.collection.get(limit=1000, include=["metadatas"])
+            metadatas = sample['metadatas'] or []
             
-            if sample['metadatas']:
-                for metadata in sample['metadatas']:
-                    memory_type = metadata.get('type', 'unknown')
-                    type_counts[memory_type] = type_counts.get(memory_type, 0) + 1
-                    
-                    importance = metadata.get('importance_score', 0.5)
-                    importance_scores.append(importance)
-            
-            # Calculate average importance
-            avg_importance = sum(importance_scores) / len(importance_scores) if importance_scores else 0
+            type_counts = dict(Counter(metadata.get('type', 'unknown') for metadata in metadatas))
+            importance_scores = np.fromiter(
+                (metadata.get('importance_score', 0.5) for metadata in metadatas),
+                dtype=np.float64,
+                count=len(metadatas)
+            )
+            has_scores = importance_scores.size > 0
             
-            return {
+            self._stats_cache = {
                 "total_memories": count,
                 "type_distribution": type_counts,
-                "average_importance_score": round(avg_importance, 2),
+                "average_importance_score": round(float(importance_scores.mean()), 2) if has_scores else 0,
                 "importance_score_range": {
-                    "min": min(importance_scores) if importance_scores else 0,
-                    "max": max(importance_scores) if importance_scores else 0
+                    "min": float(importance_scores.min()) if has_scores else 0,
+                    "max": float(importance_scores.max()) if has_scores else 0
                 },
                 "persist_directory": str(self.persist_directory)
             }
+            self._stats_ts = time.monotonic()
+            return self._stats_cache
         except Exception:
             return {"error": "Could not retrieve statistics"}
     
+    def get_performance_stats(self) -> Dict[str, Any]:
+        """Get statistics about the query embedding caches.
+        
+        Returns:
+            Dictionary with cache statistics
+        """
+        cache_info = self._cached_encode.cache_info()
+        return {
+            "query_embedding_cache": {
+                "hits": cache_info.hits,
+                "misses": cache_info.misses,
+                "size": cache_info.currsize,
+                "max_size": cache_info.maxsize
+            },
+            "disk_embedding_cache_entries": len(self._embed_cache) if self._embed_cache is not None else 0
+        }
+    
     def clear_all_memories(self) -> bool:
         """Clear all memories from the system.
         
@@ -487,7 +1022,14 @@ class MemoryManager:
             True if successful, False otherwise
         """
         try:
-            self.collection.delete(where={})
+            # Dropping the collection avoids deleting records one by one
+            name = self.collection.name
+            self.client.delete_collection(name)
+            self.collection = self.client.get_or_create_collection(
+                name=name,
+                metadata=self.COLLECTION_METADATA
+            )
+            self._invalidate_caches()
             return True
         except Exception:
             return False
@@ -502,26 +1044,59 @@ class MemoryManager:
             True if successful, False otherwise
         """
         try:
-            all_memories = self.collection.get()
-            
-            export_data = {
+            total = self.collection.count()
+            header = orjson.dumps({
                 "export_timestamp": datetime.now().isoformat(),
-                "total_memories": len(all_memories['ids']),
-                "memories": []
-            }
-            
-            for i, memory_id in enumerate(all_memories['ids']):
-                memory_data = {
-                    "id": memory_id,
-                    "content": all_memories['documents'][i],
-                    "metadata": all_memories['metadatas'][i]
-                }
-                export_data["memories"].append(memory_data)
+                "total_memories": total
+            })
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(export_data, f, indent=2, ensure_ascii=False)
+            with open(filepath, 'wb') as f:
+                # Open the object and the memories array by hand so records
+                # can be streamed page by page with bounded memory
+                f.write(header[:-1] + b', "memories": [\n')
+                
+                first = True
+                for offset in range(0, total, self.EXPORT_PAGE_SIZE):
+                    page = self.collection.get(
+                        limit=self.EXPORT_PAGE_SIZE,
+                        offset=offset,
+                        include=["documents", "metadatas"]
+                    )
+                    for memory_id, content, metadata in zip(
+                        page['ids'], page['documents'], page['metadatas']
+                    ):
+                        if not first:
+                            f.write(b",\n")
+                        first = False
+                        # Timestamps are stored as epoch nanoseconds; export them readable
+                        metadata = {
+                            key: _iso(value) if key in _TIMESTAMP_KEYS and isinstance(value, int) else value
+                            for key, value in metadata.items()
+                        }
+                        f.write(orjson.dumps(
+                            {"id": memory_id, "content": content, "metadata": metadata},
+                            option=orjson.OPT_SERIALIZE_NUMPY
+                        ))
+                
+                f.write(b"\n]}\n")
             
             return True
             
         except Exception:
             return False
+
+
+@lru_cache(maxsize=None)
+def get_memory_manager(persist_directory: Path) -> MemoryManager:
+    """Get the shared MemoryManager for a persist directory.
+    
+    Sessions and workflows in one process reuse the same Chroma client and
+    caches instead of reopening the store.
+    
+    Args:
+        persist_directory: Directory to persist memory data
+        
+    Returns:
+        Shared MemoryManager instance
+    """
+    return MemoryManager(persist_directory)
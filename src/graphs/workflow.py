@@ -3,19 +3,44 @@ LangGraph workflow for orchestrating AI assistant operations.
 Enhanced with optimized context retrieval and conversation persistence.
 """
 
-from typing import Dict, Any, List, Optional, TypedDict, Annotated
-from datetime import datetime
+from typing import AsyncGenerator, Dict, Any, List, Optional, TypedDict, Annotated
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache, partial
 import asyncio
+import os
+import re
+import threading
+import time
+
+import numpy as np
 
-from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig
 
-from ..core.agent import PersonalAssistant
-from ..core.memory import MemoryManager
+from ..core.agent import PersonalAssistant, _IMPORTANT_RE
+from ..core.memory import count_tokens
 from ..chains.chat_chain import ChatChain
 
 
+# Dedicated pool for memory reads, so retrieval never queues behind writes or
+# other work on the default executor; writes use each workflow's own writer thread
+_RETRIEVAL_POOL = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="memory-read"
+)
+
+# Canned replies for small talk that needs neither memory nor the LLM. Yes/no
+# confirmations are left out because their meaning depends on the conversation.
+_TRIVIAL_RESPONSES = tuple(
+    (re.compile(r"\s*(?:" + pattern + r")(?:\s+there)?\s*[!.?]*\s*", re.IGNORECASE), response)
+    for pattern, response in (
+        (r"hi|hello|hey|good (?:morning|afternoon|evening)", "Hello! How can I help you today?"),
+        (r"thanks|thank you|thx|ty", "You're welcome! Let me know if there's anything else I can help with."),
+        (r"bye|goodbye|see you", "Goodbye! Feel free to come back anytime."),
+    )
+)
+
+
 class AssistantState(TypedDict):
     """State for the assistant workflow."""
     messages: List[BaseMessage]
@@ -28,263 +53,409 @@ class AssistantState(TypedDict):
     error: Optional[str]
     context_tokens: int
     memory_quality_score: float
+    response_stream: Optional[asyncio.Queue]
+
+
+def _dispatch(method_name: str):
+    """Build a graph node that runs a method of the invoking workflow.
+    
+    The compiled graph is shared by every AssistantWorkflow, so the instance
+    is passed in through the run config rather than bound at compile time.
+    
+    Args:
+        method_name: Name of the AssistantWorkflow node method
+        
+    Returns:
+        Async node function
+    """
+    async def node(state: AssistantState, config: RunnableConfig) -> AssistantState:
+        workflow = config["configurable"]["workflow"]
+        return await getattr(workflow, method_name)(state)
+    
+    node.__name__ = method_name
+    return node
 
 
 class AssistantWorkflow:
     """LangGraph workflow for orchestrating AI assistant operations."""
     
-    def __init__(self):
-        """Initialize the workflow."""
-        self.assistant = PersonalAssistant()
-        self.memory_manager = MemoryManager(self.assistant.memory_manager.persist_directory)
-        self.chat_chain = ChatChain()
+    # Memory updates that may be queued before the workflow waits for the writer
+    MAX_PENDING_WRITES = 8
+    
+    def __init__(self, assistant: Optional[PersonalAssistant] = None):
+        """Initialize the workflow.
         
-        # Create the workflow graph
-        self.workflow = self._create_workflow()
+        Args:
+            assistant: Existing assistant to share; a new one is created
+                when omitted
+        """
+        self._assistant = assistant
+        
+        # Single background writer keeps embedding and disk IO off the response path
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workflow-memory")
+        self._write_slots = threading.BoundedSemaphore(self.MAX_PENDING_WRITES)
+    
+    # Heavy components are built on first use, so callers that only need
+    # get_workflow_info never load the LLM, the memory store or LangGraph
+    @cached_property
+    def assistant(self) -> PersonalAssistant:
+        """Assistant whose memory the workflow shares."""
+        return self._assistant or PersonalAssistant()
+    
+    @cached_property
+    def memory_manager(self):
+        """Memory manager, reused from the assistant instead of opening the store twice."""
+        return self.assistant.memory_manager
+    
+    @cached_property
+    def chat_chain(self) -> ChatChain:
+        """Chat chain used to generate responses."""
+        return ChatChain()
+    
+    @cached_property
+    def workflow(self):
+        """Compiled graph; the topology is static, so every workflow shares one."""
+        return self._create_workflow()
     
-    def _create_workflow(self) -> StateGraph:
-        """Create the LangGraph workflow.
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _create_workflow():
+        """Create and compile the LangGraph workflow once per process.
         
         Returns:
             Configured StateGraph
         """
+        from langgraph.graph import StateGraph, END
+        
         # Create the workflow
         workflow = StateGraph(AssistantState)
         
         # Add nodes
-        workflow.add_node("input_processor", self._process_input)
-        workflow.add_node("memory_retriever", self._retrieve_memory)
-        workflow.add_node("context_analyzer", self._analyze_context)
-        workflow.add_node("response_generator", self._generate_response)
-        workflow.add_node("memory_updater", self._update_memory)
-        workflow.add_node("output_formatter", self._format_output)
+        workflow.add_node("input_processor", _dispatch("_process_input"))
+        workflow.add_node("memory_retriever", _dispatch("_retrieve_memory"))
+        workflow.add_node("context_analyzer", _dispatch("_analyze_context"))
+        workflow.add_node("response_generator", _dispatch("_generate_response"))
+        workflow.add_node("memory_updater", _dispatch("_update_memory"))
+        workflow.add_node("output_formatter", _dispatch("_format_output"))
         
         # Define the workflow edges
         workflow.set_entry_point("input_processor")
         
-        workflow.add_edge("input_processor", "memory_retriever")
+        workflow.add_conditional_edges(
+            "input_processor",
+            AssistantWorkflow._route_input,
+            {"trivial": "output_formatter", "normal": "memory_retriever"}
+        )
         workflow.add_edge("memory_retriever", "context_analyzer")
         workflow.add_edge("context_analyzer", "response_generator")
-        workflow.add_edge("response_generator", "memory_updater")
+        workflow.add_conditional_edges(
+            "response_generator",
+            AssistantWorkflow._route_response,
+            {"persist": "memory_updater", "skip": "output_formatter"}
+        )
         workflow.add_edge("memory_updater", "output_formatter")
         workflow.add_edge("output_formatter", END)
         
         # Compile the workflow
         return workflow.compile()
     
-    async def _process_input(self, state: AssistantState) -> AssistantState:
+    async def _process_input(self, state: AssistantState) -> Dict[str, Any]:
         """Process user input and prepare for workflow.
         
         Args:
             state: Current workflow state
             
         Returns:
-            Updated state
+            State updates
         """
         try:
             # Extract user input from the last message
+            user_input = state["user_input"]
             if state["messages"]:
                 last_message = state["messages"][-1]
                 if isinstance(last_message, HumanMessage):
-                    state["user_input"] = last_message.content
+                    user_input = last_message.content
             
             # Set workflow step
-            state["workflow_step"] = "input_processed"
+            updates = {"user_input": user_input, "workflow_step": "input_processed"}
+            
+            # Answer small talk directly, skipping retrieval and the LLM
+            for pattern, response in _TRIVIAL_RESPONSES:
+                if pattern.fullmatch(user_input):
+                    updates["response"] = response
+                    break
             
-            return state
+            return updates
             
         except Exception as e:
-            state["error"] = f"Error processing input: {str(e)}"
-            return state
+            return {"error": f"Error processing input: {str(e)}"}
     
-    async def _retrieve_memory(self, state: AssistantState) -> AssistantState:
+    @staticmethod
+    def _route_input(state: AssistantState) -> str:
+        """Choose the path after input processing.
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            "trivial" when a canned response is ready, otherwise "normal"
+        """
+        return "trivial" if state["response"] else "normal"
+    
+    @staticmethod
+    def _route_response(state: AssistantState) -> str:
+        """Choose whether the turn needs a memory write.
+        
+        Args:
+            state: Current workflow state
+            
+        Returns:
+            "skip" for failed responses, otherwise "persist"
+        """
+        if state.get("error") or not state["response"]:
+            return "skip"
+        return "persist"
+    
+    async def _retrieve_memory(self, state: AssistantState) -> Dict[str, Any]:
         """Retrieve relevant memories for context using optimized retrieval.
         
         Args:
             state: Current workflow state
             
         Returns:
-            Updated state
+            State updates
         """
         try:
             user_input = state["user_input"]
             
-            # Use optimized context retrieval
-            optimized_context = self.memory_manager.get_optimized_context(
-                query=user_input,
-                max_tokens=600,  # Reserve tokens for conversation and response
-                n_results=6,     # Get more memories for better context
-                include_summaries=True
-            )
-            
-            # Get raw memory results for analysis
-            memory_results = self.memory_manager.search_memory(
+            # One vector search serves both the analysis and the optimized context
+            loop = asyncio.get_running_loop()
+            memory_results = await loop.run_in_executor(_RETRIEVAL_POOL, partial(
+                self.memory_manager.search_memory,
                 query=user_input,
                 n_results=8,
                 min_importance=0.3  # Include moderately important memories
+            ))
+            
+            # Build context from the 6 best of those that are at least moderately important
+            context_memories = [
+                memory for memory in memory_results
+                if memory[2].get('importance_score', 0.5) >= 0.4
+            ][:6]
+            optimized_context = self.memory_manager.build_context(
+                context_memories,
+                max_tokens=600,  # Reserve tokens for conversation and response
+                include_summaries=True
             )
             
-            state["context"] = optimized_context
-            state["memory_results"] = memory_results
-            state["context_tokens"] = len(optimized_context) // 4  # Rough token estimation
-            state["workflow_step"] = "memory_retrieved"
-            
-            return state
+            return {
+                "context": optimized_context,
+                "memory_results": memory_results,
+                "context_tokens": count_tokens(optimized_context),
+                "workflow_step": "memory_retrieved"
+            }
             
         except Exception as e:
-            state["error"] = f"Error retrieving memory: {str(e)}"
-            return state
+            return {"error": f"Error retrieving memory: {str(e)}"}
     
-    async def _analyze_context(self, state: AssistantState) -> AssistantState:
+    async def _analyze_context(self, state: AssistantState) -> Dict[str, Any]:
         """Analyze context and prepare for response generation.
         
         Args:
             state: Current workflow state
             
         Returns:
-            Updated state
+            State updates
         """
         try:
             # Calculate memory quality score based on relevance and importance
             memory_results = state["memory_results"]
             if memory_results:
-                # Calculate average relevance and importance scores
-                relevance_scores = [score for _, score, _ in memory_results]
-                importance_scores = [meta.get('importance_score', 0.5) for _, _, meta in memory_results]
-                
-                avg_relevance = sum(relevance_scores) / len(relevance_scores)
-                avg_importance = sum(importance_scores) / len(importance_scores)
+                # Calculate average relevance and importance scores in one pass
+                scores = np.empty((len(memory_results), 2), dtype=np.float64)
+                for i, (_, score, meta) in enumerate(memory_results):
+                    scores[i] = (score, meta.get('importance_score', 0.5))
+                avg_relevance, avg_importance = scores.mean(axis=0)
                 
                 # Combined quality score (70% relevance, 30% importance)
-                memory_quality_score = (avg_relevance * 0.7) + (avg_importance * 0.3)
+                memory_quality_score = float((avg_relevance * 0.7) + (avg_importance * 0.3))
             else:
                 memory_quality_score = 0.0
             
-            state["memory_quality_score"] = round(memory_quality_score, 2)
-            state["workflow_step"] = "context_analyzed"
-            
-            return state
+            return {
+                "memory_quality_score": round(memory_quality_score, 2),
+                "workflow_step": "context_analyzed"
+            }
             
         except Exception as e:
-            state["error"] = f"Error analyzing context: {str(e)}"
-            return state
+            return {"error": f"Error analyzing context: {str(e)}"}
     
-    async def _generate_response(self, state: AssistantState) -> AssistantState:
+    async def _generate_response(self, state: AssistantState) -> Dict[str, Any]:
         """Generate AI response using the chat chain with optimized context.
         
         Args:
             state: Current workflow state
             
         Returns:
-            Updated state
+            State updates
         """
         try:
             user_input = state["user_input"]
             context = state["context"]
-            history = state["messages"][:-1] if len(state["messages"]) > 1 else []
-            
-            # Generate response using chat chain
-            response = await self.chat_chain.chat(
-                user_input=user_input,
-                context=context,
-                history=history
-            )
-            
-            state["response"] = response
-            state["workflow_step"] = "response_generated"
-            
-            return state
+            # Copy only the messages the chat chain will format, not the whole conversation
+            history = state["messages"][-ChatChain.HISTORY_LIMIT - 1:-1]
+            
+            # Generate response using chat chain, forwarding chunks as they arrive
+            response_stream = state.get("response_stream")
+            if response_stream is None:
+                response = await self.chat_chain.chat(
+                    user_input=user_input,
+                    context=context,
+                    history=history
+                )
+            else:
+                chunks = []
+                async for chunk in self.chat_chain.stream_chat(
+                    user_input=user_input,
+                    context=context,
+                    history=history
+                ):
+                    chunks.append(chunk)
+                    response_stream.put_nowait(chunk)
+                response = "".join(chunks)
+            
+            return {"response": response, "workflow_step": "response_generated"}
             
         except Exception as e:
-            state["error"] = f"Error generating response: {str(e)}"
-            return state
+            return {"error": f"Error generating response: {str(e)}"}
     
-    async def _update_memory(self, state: AssistantState) -> AssistantState:
-        """Update memory with new information and persist conversation.
+    async def _update_memory(self, state: AssistantState) -> Dict[str, Any]:
+        """Queue memory updates so persistence stays off the response path.
         
         Args:
             state: Current workflow state
             
         Returns:
-            Updated state
+            State updates
         """
         try:
             user_input = state["user_input"]
             response = state["response"]
             
+            conversation_metadata = {
+                "source": "workflow",
+                "workflow_step": state["workflow_step"],
+                "memory_quality_score": state["memory_quality_score"],
+                "context_tokens": state["context_tokens"]
+            }
+            
+            # Store important information in memory (if not already done)
+            is_important = _IMPORTANT_RE.search(user_input) is not None
+            
+            # Wait for a free slot rather than dropping the write when too many are pending
+            if not self._write_slots.acquire(blocking=False):
+                await asyncio.to_thread(self._write_slots.acquire)
+            self._write_executor.submit(
+                self._write_memories,
+                user_input,
+                response,
+                conversation_metadata,
+                is_important
+            )
+            
+            return {"workflow_step": "memory_updated"}
+            
+        except Exception as e:
+            return {"error": f"Error updating memory: {str(e)}"}
+    
+    def _write_memories(
+        self,
+        user_input: str,
+        response: str,
+        conversation_metadata: Dict[str, Any],
+        is_important: bool
+    ):
+        """Persist a conversation turn; runs on the background writer thread.
+        
+        Args:
+            user_input: User's message
+            response: Assistant's response
+            conversation_metadata: Metadata for the conversation memory
+            is_important: Whether to also store the turn as important information
+        """
+        try:
             # Automatically persist conversation to long-term memory
-            self.memory_manager.add_conversation_memory(
+            content, importance_score, metadata = self.memory_manager.build_conversation_memory(
                 user_input=user_input,
                 assistant_response=response,
-                metadata={
-                    "source": "workflow",
-                    "workflow_step": state["workflow_step"],
-                    "memory_quality_score": state["memory_quality_score"],
-                    "context_tokens": state["context_tokens"]
-                }
+                metadata=conversation_metadata
             )
-            
-            # Store important information in memory (if not already done)
-            important_keywords = [
-                "remember", "important", "save", "note", "preference", 
-                "like", "dislike", "always", "never", "favorite",
-                "critical", "essential", "key", "vital", "crucial"
-            ]
-            
-            is_important = any(keyword in user_input.lower() for keyword in important_keywords)
+            contents = [content]
+            memory_types = ["conversation"]
+            importance_scores = [importance_score]
+            metadatas = [metadata]
             
             if is_important:
-                memory_content = f"User: {user_input}\nAssistant: {response}"
-                self.memory_manager.add_memory(
-                    content=memory_content,
-                    memory_type="important_info",
-                    importance_score=0.9,  # High importance for explicitly marked content
-                    metadata={
-                        "timestamp": datetime.now().isoformat(),
-                        "source": "workflow",
-                        "workflow_step": state["workflow_step"],
-                        "explicitly_important": True
-                    }
-                )
-            
-            state["workflow_step"] = "memory_updated"
-            return state
-            
+                contents.append(content)
+                memory_types.append("important_info")
+                importance_scores.append(0.9)  # High importance for explicitly marked content
+                # add_memories stamps the whole batch with one timestamp
+                metadatas.append({
+                    "source": conversation_metadata["source"],
+                    "workflow_step": conversation_metadata["workflow_step"],
+                    "explicitly_important": True
+                })
+            
+            # One batched call embeds both memories in a single model pass
+            self.memory_manager.add_memories(
+                contents=contents,
+                memory_types=memory_types,
+                metadatas=metadatas,
+                importance_scores=importance_scores
+            )
         except Exception as e:
-            state["error"] = f"Error updating memory: {str(e)}"
-            return state
+            # Log error but don't fail the conversation
+            print(f"Warning: Failed to update memory: {e}")
+        finally:
+            self._write_slots.release()
     
-    async def _format_output(self, state: AssistantState) -> AssistantState:
+    def flush_pending_writes(self):
+        """Block until all queued memory updates are stored."""
+        # The single writer thread runs jobs in order, so this waits for earlier ones
+        self._write_executor.submit(lambda: None).result()
+    
+    async def _format_output(self, state: AssistantState) -> Dict[str, Any]:
         """Format the final output.
         
         Args:
             state: Current workflow state
             
         Returns:
-            Updated state
+            State updates
         """
         try:
-            # Add AI response to messages
-            ai_message = AIMessage(content=state["response"])
-            state["messages"].append(ai_message)
+            # Add AI response to messages; the caller's list is extended in place
+            messages = state["messages"]
+            messages.append(AIMessage(content=state["response"]))
             
-            state["workflow_step"] = "output_formatted"
-            return state
+            return {"messages": messages, "workflow_step": "output_formatted"}
             
         except Exception as e:
-            state["error"] = f"Error formatting output: {str(e)}"
-            return state
+            return {"error": f"Error formatting output: {str(e)}"}
     
     async def process_message(
         self, 
         user_input: str, 
-        messages: List[BaseMessage] = None
+        messages: List[BaseMessage] = None,
+        response_stream: Optional[asyncio.Queue] = None
     ) -> Dict[str, Any]:
         """Process a user message through the workflow.
         
         Args:
             user_input: User's message
             messages: Previous conversation messages
+            response_stream: Optional queue that receives LLM response chunks
+                as they are generated
             
         Returns:
             Workflow result
@@ -308,11 +479,15 @@ class AssistantWorkflow:
                 workflow_step="started",
                 error=None,
                 context_tokens=0,
-                memory_quality_score=0.0
+                memory_quality_score=0.0,
+                response_stream=response_stream
             )
             
             # Execute workflow
-            result = await self.workflow.ainvoke(initial_state)
+            result = await self.workflow.ainvoke(
+                initial_state,
+                config={"configurable": {"workflow": self}}
+            )
             
             return {
                 "success": True,
@@ -331,6 +506,34 @@ class AssistantWorkflow:
                 "response": "I apologize, but I encountered an error processing your request."
             }
     
+    async def process_message_stream(
+        self,
+        user_input: str,
+        messages: List[BaseMessage] = None
+    ) -> AsyncGenerator[str, None]:
+        """Process a user message, yielding the response as it is generated.
+        
+        Args:
+            user_input: User's message
+            messages: Previous conversation messages
+            
+        Yields:
+            Response text chunks
+        """
+        response_stream: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.process_message(user_input, messages, response_stream))
+        task.add_done_callback(lambda _: response_stream.put_nowait(None))
+        
+        streamed = False
+        while (chunk := await response_stream.get()) is not None:
+            streamed = True
+            yield chunk
+        
+        # Cached, canned and failed responses never pass through the LLM stream
+        result = await task
+        if not streamed and result["response"]:
+            yield result["response"]
+    
     def get_workflow_info(self) -> Dict[str, Any]:
         """Get information about the workflow.
         
@@ -353,7 +556,8 @@ class AssistantWorkflow:
                 "Optimized context retrieval",
                 "Memory quality scoring",
                 "Token-aware context management",
-                "Importance-based memory prioritization"
+                "Importance-based memory prioritization",
+                "Canned replies for greetings and thanks"
             ]
         }
     
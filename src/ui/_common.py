@@ -0,0 +1,558 @@
+"""
+Shared implementation of the Streamlit web interfaces.
+
+Both `src/ui/streamlit_app.py` and `streamlit_app_standalone.py` call
+`run_app`; the standalone variant adds the analysis and settings tabs and
+tracks a conversation id.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+import streamlit as st
+from pathlib import Path
+from datetime import datetime
+import orjson
+from langchain_core.messages import HumanMessage, AIMessage
+
+from ..core.agent import PersonalAssistant
+from ..core.memory import MemoryManager, get_memory_manager as get_shared_memory_manager
+from ..graphs.workflow import AssistantWorkflow
+from ..core.config import settings, configure_performance_environment
+
+
+# uvloop schedules callbacks and socket IO faster than the stock loop; only the
+# assistant loop uses it, so Streamlit's own server loop is left untouched
+try:
+    import uvloop
+    _new_event_loop = uvloop.new_event_loop
+except ImportError:
+    _new_event_loop = asyncio.new_event_loop
+
+# Timestamp format for conversation ids and export file names
+_TS_FMT = "%Y%m%d_%H%M%S"
+
+# Redraw a streaming reply at most this often (seconds) rather than once per token
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Settings are fixed for the process, so the settings tab payload is serialized once
+SETTINGS_JSON = orjson.dumps({
+    "model_name": settings.model_name,
+    "temperature": settings.temperature,
+    "max_tokens": settings.max_tokens,
+    "memory_persist_dir": str(settings.memory_persist_dir),
+    "memory_collection_name": settings.memory_collection_name,
+    "memory_embedding_model": settings.memory_embedding_model,
+    "memory_similarity_threshold": settings.memory_similarity_threshold,
+    "memory_max_results": settings.memory_max_results
+}, option=orjson.OPT_INDENT_2).decode()
+
+
+def initialize_session_state(standalone: bool = False):
+    """Initialize Streamlit session state variables.
+    
+    Args:
+        standalone: Whether to also track a conversation id
+    """
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+    
+    if "lc_messages" not in st.session_state:
+        # LangChain copies of `messages`, appended alongside them each turn
+        st.session_state.lc_messages = []
+    
+    if "role_counts" not in st.session_state:
+        # Running message counts per role for the analysis tab
+        st.session_state.role_counts = {"user": 0, "assistant": 0}
+    
+    if "assistant" not in st.session_state:
+        st.session_state.assistant = None
+    
+    if "chat_mode" not in st.session_state:
+        st.session_state.chat_mode = "simple"  # "simple" or "workflow"
+    
+    if standalone and "conversation_id" not in st.session_state:
+        st.session_state.conversation_id = datetime.now().strftime(_TS_FMT)
+
+
+@st.cache_resource
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Get the event loop shared by every session.
+    
+    The loop runs forever on a daemon thread, so the async clients held by
+    the shared LLM and workflow always stay on the loop they were created on.
+    """
+    loop = _new_event_loop()
+    threading.Thread(target=loop.run_forever, name="assistant-loop", daemon=True).start()
+    return loop
+
+
+def get_memory_manager() -> MemoryManager:
+    """Get the memory manager shared by every session."""
+    # Same instance the agent and workflow fall back to, so there is one Chroma client
+    return get_shared_memory_manager(settings.memory_persist_dir)
+
+
+@st.cache_resource
+def get_workflow() -> AssistantWorkflow:
+    """Get the workflow shared by every session.
+    
+    Conversation history is passed in on each turn, so one instance serves
+    all sessions.
+    """
+    return AssistantWorkflow(assistant=PersonalAssistant(memory_manager=get_memory_manager()))
+
+
+def initialize_assistant():
+    """Initialize the AI assistant components."""
+    try:
+        if st.session_state.assistant is None:
+            # The assistant keeps this session's chat history, so it is not shared
+            st.session_state.assistant = PersonalAssistant(memory_manager=get_memory_manager())
+        
+        # Build the shared resources now so failures surface here
+        get_workflow()
+        
+        return True
+    except Exception as e:
+        st.error(f"Error initializing assistant: {str(e)}")
+        return False
+
+
+def display_header():
+    """Display the application header."""
+    st.title("🤖 AI Personal Assistant")
+    st.markdown("**Your intelligent companion with long-term memory and conversation persistence**")
+    
+    # Display model info
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Model", settings.model_name)
+    with col2:
+        st.metric("Temperature", settings.temperature)
+    with col3:
+        st.metric("Max Tokens", settings.max_tokens)
+
+
+def display_sidebar(standalone: bool = False):
+    """Display the sidebar with controls and information.
+    
+    Args:
+        standalone: Whether to show the conversation id
+    """
+    with st.sidebar:
+        st.header("🎛️ Controls")
+        
+        # Chat mode selection
+        chat_mode = st.selectbox(
+            "Chat Mode",
+            ["Simple", "Workflow"],
+            index=0 if st.session_state.chat_mode == "simple" else 1
+        )
+        st.session_state.chat_mode = chat_mode.lower()
+        
+        st.divider()
+        
+        # Memory controls
+        st.subheader("🧠 Memory Management")
+        
+        if st.button("View Memory Stats"):
+            display_memory_stats()
+        
+        if st.button("View Memory Insights"):
+            display_memory_insights()
+        
+        if st.button("Clear Conversation"):
+            st.session_state.messages = []
+            st.session_state.lc_messages = []
+            st.session_state.role_counts = {"user": 0, "assistant": 0}
+            if st.session_state.assistant:
+                st.session_state.assistant.clear_conversation_memory()
+            st.rerun()
+        
+        if st.button("Export Memories"):
+            export_memories()
+        
+        st.divider()
+        
+        # System information
+        st.subheader("ℹ️ System Info")
+        st.info(f"Memory Directory: {settings.memory_persist_dir}")
+        st.info(f"Debug Mode: {settings.debug}")
+        if standalone:
+            st.info(f"Conversation ID: {st.session_state.conversation_id}")
+        
+        # Workflow information
+        with st.expander("🔄 Workflow Info", expanded=False):
+            st.json(get_workflow().get_workflow_info())
+
+
+def display_memory_stats():
+    """Display memory statistics."""
+    stats = get_memory_manager().get_memory_stats()
+    
+    st.subheader("Memory Statistics")
+    
+    # Display key metrics
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Memories", stats.get("total_memories", 0))
+    with col2:
+        st.metric("Avg Importance", f"{stats.get('average_importance_score', 0):.2f}")
+    with col3:
+        importance_range = stats.get("importance_score_range", {})
+        st.metric("Importance Range", f"{importance_range.get('min', 0):.1f} - {importance_range.get('max', 0):.1f}")
+    
+    # Display type distribution
+    if "type_distribution" in stats:
+        st.subheader("Memory Type Distribution")
+        type_data = stats["type_distribution"]
+        if type_data:
+            for mem_type, count in type_data.items():
+                st.write(f"**{mem_type.title()}**: {count}")
+    
+    # Display full stats
+    with st.expander("Full Memory Statistics"):
+        st.json(stats)
+
+
+def display_memory_insights():
+    """Display memory insights and conversation patterns."""
+    if st.session_state.assistant:
+        insights = st.session_state.assistant.get_memory_insights()
+        
+        st.subheader("Memory Insights")
+        
+        # Display conversation quality metrics
+        if "conversation_quality" in insights:
+            quality = insights["conversation_quality"]
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("High Importance", quality.get("high_importance", 0))
+            with col2:
+                st.metric("Medium Importance", quality.get("medium_importance", 0))
+            with col3:
+                st.metric("Low Importance", quality.get("low_importance", 0))
+        
+        # Display recent conversations count
+        if "recent_conversations" in insights:
+            st.metric("Recent Conversations", insights.get("recent_conversations", 0))
+        
+        # Display full insights
+        with st.expander("Full Memory Insights"):
+            st.json(insights)
+
+
+def export_memories():
+    """Export memories to a file."""
+    export_path = Path("./data") / f"memories_export_{datetime.now().strftime(_TS_FMT)}.json"
+    
+    if get_memory_manager().export_memories(export_path):
+        st.success(f"Memories exported to: {export_path}")
+    else:
+        st.error("Failed to export memories")
+
+
+@st.fragment
+def display_chat_interface():
+    """Display the main chat interface.
+    
+    Runs as a fragment, so a chat turn only re-renders the chat pane.
+    """
+    st.subheader("💬 Chat Interface")
+    
+    # Chat input
+    user_input = st.chat_input("Type your message here...")
+    
+    # Display chat messages
+    for message in st.session_state.messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    
+    if user_input:
+        with st.chat_message("user"):
+            st.markdown(user_input)
+        
+        # Process message based on chat mode
+        with st.chat_message("assistant"):
+            placeholder = st.empty()
+            if st.session_state.chat_mode == "workflow":
+                response = process_message_with_workflow(user_input)
+            else:
+                response = process_message_simple(user_input, placeholder)
+            placeholder.markdown(response)
+        
+        # Record the whole turn at once so the history never holds half of it
+        st.session_state.messages.extend([
+            {"role": "user", "content": user_input},
+            {"role": "assistant", "content": response}
+        ])
+        st.session_state.lc_messages.extend([
+            HumanMessage(content=user_input),
+            AIMessage(content=response)
+        ])
+        st.session_state.role_counts["user"] += 1
+        st.session_state.role_counts["assistant"] += 1
+
+
+def run_async(coro):
+    """Run a coroutine on the shared event loop and wait for its result."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+
+def render_stream(chunks, placeholder) -> str:
+    """Draw streamed response chunks into a placeholder, throttling redraws.
+    
+    The chunks are produced on the shared event loop and drawn from the
+    script thread, which owns the Streamlit elements.
+    
+    Args:
+        chunks: Async iterator of response text chunks
+        placeholder: Streamlit element the response is drawn into
+        
+    Returns:
+        The full response text
+    """
+    pending = queue.SimpleQueue()
+    
+    async def pump():
+        try:
+            async for chunk in chunks:
+                pending.put(chunk)
+        finally:
+            pending.put(None)
+    
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    
+    buffer = []
+    last_flush = time.monotonic()
+    while (chunk := pending.get()) is not None:
+        buffer.append(chunk)
+        if time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL:
+            placeholder.markdown("".join(buffer))
+            last_flush = time.monotonic()
+    
+    # Surface any error raised while streaming
+    future.result()
+    return "".join(buffer)
+
+
+def process_message_simple(user_input: str, placeholder) -> str:
+    """Process message using simple chat mode, streaming the reply."""
+    try:
+        if st.session_state.assistant:
+            chunks = run_async(st.session_state.assistant.chat(user_input, stream=True))
+            return render_stream(chunks, placeholder)
+        else:
+            return "Assistant not initialized. Please check the configuration."
+    except Exception as e:
+        return f"I apologize, but I encountered an error: {str(e)}"
+
+
+def process_message_with_workflow(user_input: str) -> str:
+    """Process message using workflow mode."""
+    try:
+        result = run_async(
+            # Pass a copy; the workflow appends the new user message to it
+            get_workflow().process_message(user_input, list(st.session_state.lc_messages))
+        )
+        
+        if result["success"]:
+            # Fragments cannot write to the sidebar, so surface insights as a toast
+            if "context_tokens" in result and "memory_quality_score" in result:
+                st.toast(f"Context: ~{result['context_tokens']} tokens | Quality: {result['memory_quality_score']:.2f}")
+            
+            return result["response"]
+        else:
+            return f"Workflow error: {result.get('error', 'Unknown error')}"
+    except Exception as e:
+        return f"I apologize, but I encountered an error: {str(e)}"
+
+
+@st.fragment
+def display_memory_search():
+    """Display memory search interface."""
+    st.subheader("🔍 Memory Search")
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        search_query = st.text_input("Search memories", key="memory_search")
+    
+    with col2:
+        search_button = st.button("Search", key="search_btn")
+    
+    if search_button and search_query:
+        # Search with importance filtering
+        results = get_memory_manager().search_memory(
+            query=search_query,
+            n_results=5,
+            min_importance=0.3  # Only show moderately important memories
+        )
+        
+        if results:
+            st.subheader("Search Results")
+            # One table element instead of an expander and two writes per hit
+            st.dataframe(
+                [
+                    {
+                        "#": i + 1,
+                        "Score": round(score, 2),
+                        "Importance": metadata.get('importance_score', 0.5),
+                        "Type": metadata.get('type', 'memory'),
+                        "Content": content,
+                        "Metadata": orjson.dumps(metadata).decode()
+                    }
+                    for i, (content, score, metadata) in enumerate(results)
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+        else:
+            st.info("No memories found matching your search.")
+        
+        # Show optimized context preview
+        st.subheader("📊 Optimized Context Preview")
+        optimized_context = get_memory_manager().get_optimized_context(
+            query=search_query,
+            max_tokens=300,
+            n_results=3,
+            include_summaries=True
+        )
+        
+        if optimized_context:
+            st.info("**Preview of how this query would be contextualized:**")
+            st.text(optimized_context)
+        else:
+            st.info("No relevant context found for this query.")
+
+
+@st.fragment
+def display_add_memory():
+    """Display interface for adding new memories."""
+    st.subheader("➕ Add Memory")
+    
+    with st.form("add_memory_form"):
+        memory_content = st.text_area("Memory content", height=100)
+        memory_type = st.selectbox(
+            "Memory type",
+            ["conversation", "fact", "preference", "task", "important_info", "other"]
+        )
+        importance_score = st.slider(
+            "Importance score",
+            min_value=0.0,
+            max_value=1.0,
+            value=0.6,
+            step=0.1,
+            help="0.0 = Low importance, 1.0 = High importance"
+        )
+        metadata = st.text_input("Additional metadata (JSON format)", value="{}")
+        
+        submitted = st.form_submit_button("Add Memory")
+        
+        if submitted and memory_content:
+            try:
+                # Parse metadata
+                metadata_dict = orjson.loads(metadata) if metadata else {}
+                
+                # Add memory with importance score
+                memory_id = get_memory_manager().add_memory(
+                    content=memory_content,
+                    memory_type=memory_type,
+                    metadata=metadata_dict,
+                    importance_score=importance_score
+                )
+                
+                st.success(f"Memory added successfully! ID: {memory_id}")
+                
+            except orjson.JSONDecodeError:
+                st.error("Invalid JSON format for metadata")
+            except Exception as e:
+                st.error(f"Error adding memory: {str(e)}")
+
+
+def display_conversation_analysis():
+    """Display conversation analysis and insights."""
+    st.subheader("📈 Conversation Analysis")
+    
+    if st.session_state.messages:
+        role_counts = st.session_state.role_counts
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Messages", len(st.session_state.messages))
+        with col2:
+            st.metric("User Messages", role_counts["user"])
+        with col3:
+            st.metric("Assistant Responses", role_counts["assistant"])
+        
+        # Show conversation flow
+        st.subheader("Conversation Flow")
+        for i, msg in enumerate(st.session_state.messages):
+            if msg["role"] == "user":
+                st.write(f"👤 **User {i//2 + 1}:** {msg['content']}")
+            else:
+                st.write(f"🤖 **Assistant {i//2 + 1}:** {msg['content']}")
+            if i < len(st.session_state.messages) - 1:
+                st.divider()
+    else:
+        st.info("No conversation history available. Start chatting to see analysis!")
+
+
+def run_app(variant: str = "default"):
+    """Run the Streamlit application.
+    
+    Args:
+        variant: "default", or "standalone" for the extra analysis and
+            settings tabs and conversation id
+    """
+    # Must precede every other Streamlit call
+    st.set_page_config(
+        page_title="AI Personal Assistant",
+        page_icon="🤖",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    standalone = variant == "standalone"
+    
+    # Once per process, before any session loads the embedding model
+    configure_performance_environment()
+    
+    # Initialize session state
+    initialize_session_state(standalone)
+    
+    # Display header
+    display_header()
+    
+    # Initialize assistant
+    if not initialize_assistant():
+        st.error("Failed to initialize the AI assistant. Please check your configuration.")
+        return
+    
+    # Create tabs
+    tab_names = ["💬 Chat", "🔍 Memory Search", "➕ Add Memory"]
+    if standalone:
+        tab_names += ["📈 Analysis", "⚙️ Settings"]
+    tabs = st.tabs(tab_names)
+    
+    with tabs[0]:
+        display_chat_interface()
+    
+    with tabs[1]:
+        display_memory_search()
+    
+    with tabs[2]:
+        display_add_memory()
+    
+    if standalone:
+        with tabs[3]:
+            display_conversation_analysis()
+        
+        with tabs[4]:
+            st.subheader("⚙️ Configuration Settings")
+            st.code(SETTINGS_JSON, language="json")
+    
+    # Display sidebar
+    display_sidebar(standalone)
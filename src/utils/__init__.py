@@ -0,0 +1,7 @@
+"""
+Utility helpers for the AI personal assistant.
+"""
+
+from .early_input import start_capturing_early_input, read_input, read_input_async
+
+__all__ = ["start_capturing_early_input", "read_input", "read_input_async"]
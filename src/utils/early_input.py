@@ -0,0 +1,97 @@
+"""
+Early stdin capture so keystrokes typed during startup are not lost.
+"""
+
+import asyncio
+import queue
+import sys
+import threading
+from typing import Optional
+
+
+# Lines read from stdin; None marks end of input
+_lines: "queue.Queue[Optional[str]]" = queue.Queue()
+_thread: Optional[threading.Thread] = None
+
+# Seconds between checks of the buffer while waiting asynchronously
+_POLL_INTERVAL = 0.05
+
+
+def _read_stdin():
+    """Read stdin line by line into the shared buffer until EOF."""
+    for line in iter(sys.stdin.readline, ''):
+        _lines.put(line.rstrip('\n'))
+    _lines.put(None)
+
+
+def start_capturing_early_input():
+    """Start buffering stdin in a background thread.
+    
+    Once started, the reader owns stdin for the rest of the process, so
+    all subsequent input must go through read_input() or read_input_async().
+    """
+    global _thread
+    if _thread is None:
+        _thread = threading.Thread(target=_read_stdin, name="early-input", daemon=True)
+        _thread.start()
+
+
+def read_input(prompt: str = "") -> str:
+    """Read a line of user input, returning early-typed lines first.
+    
+    Args:
+        prompt: Prompt to display
+        
+    Returns:
+        The line entered by the user, without the trailing newline
+        
+    Raises:
+        EOFError: If stdin has been closed
+    """
+    if _thread is None:
+        return input(prompt)
+    
+    print(prompt, end="", flush=True)
+    return _take_line(_lines.get())
+
+
+async def read_input_async(prompt: str = "") -> str:
+    """Read a line of user input without blocking the event loop.
+    
+    The buffer is polled instead of waited on from a worker thread, so a
+    cancelled wait (e.g. Ctrl-C under asyncio.run) exits at once rather than
+    leaving a thread blocked until the next line arrives.
+    
+    Args:
+        prompt: Prompt to display
+        
+    Returns:
+        The line entered by the user, without the trailing newline
+        
+    Raises:
+        EOFError: If stdin has been closed
+    """
+    start_capturing_early_input()
+    
+    print(prompt, end="", flush=True)
+    while True:
+        try:
+            return _take_line(_lines.get_nowait())
+        except queue.Empty:
+            await asyncio.sleep(_POLL_INTERVAL)
+
+
+def _take_line(line: Optional[str]) -> str:
+    """Return a buffered line, raising EOFError at end of input.
+    
+    Args:
+        line: Line taken from the buffer, or None at end of input
+        
+    Returns:
+        The line
+    """
+    if line is None:
+        # Keep end of input visible to later reads
+        _lines.put(None)
+        raise EOFError
+    return line
@@ -0,0 +1,54 @@
+"""
+Shared pytest configuration.
+"""
+
+import hashlib
+import os
+import re
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# Keep test memories in Chroma's in-memory store instead of syncing them to disk
+os.environ.setdefault("MEMORY_BACKEND", "memory")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class FakeEmbedder:
+    """Deterministic stand-in for the sentence-transformers model.
+    
+    Each lowercase word is hashed into one of `dim` buckets, so texts sharing
+    words still score as similar without running the real model.
+    """
+    
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        # Uncased, like the default model's tokenizer
+        self.tokenizer = SimpleNamespace(do_lower_case=True)
+    
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        vector[-1] = 0.1  # Keeps empty texts off the zero vector
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            vector[int.from_bytes(digest, "little") % (self.dim - 1)] += 1.0
+        return vector / np.linalg.norm(vector)
+    
+    def encode(self, texts, **kwargs):
+        """Embed a text or list of texts, mirroring SentenceTransformer.encode."""
+        if isinstance(texts, str):
+            return self._embed(texts)
+        return np.stack([self._embed(text) for text in texts])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_embedding_model():
+    """Serve every MemoryManager the fake embedder instead of loading the model."""
+    from src.core.config import settings
+    from src.core.memory import _MODEL_CACHE
+    
+    _MODEL_CACHE[settings.memory_embedding_model] = FakeEmbedder()
+    yield
+    _MODEL_CACHE.pop(settings.memory_embedding_model, None)
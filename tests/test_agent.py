@@ -6,20 +6,22 @@ import pytest
 import tempfile
 from pathlib import Path
 from unittest.mock import Mock, patch, AsyncMock
+from langchain_core.messages import HumanMessage, AIMessage
 
+from src.core.llm import get_llm
 from src.core.agent import PersonalAssistant
 
 
 class TestPersonalAssistant:
     """Test cases for PersonalAssistant class."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def temp_dir(self):
         """Create a temporary directory for testing."""
         with tempfile.TemporaryDirectory() as temp_dir:
             yield Path(temp_dir)
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_settings(self, temp_dir):
         """Create mock settings for testing."""
         with patch('src.core.agent.settings') as mock_settings:
@@ -30,28 +32,51 @@ class TestPersonalAssistant:
             mock_settings.memory_persist_dir = temp_dir
             yield mock_settings
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_llm(self):
         """Create a mock LLM for testing."""
         mock_llm = Mock()
-        mock_llm.ainvoke.return_value.content = "Test response"
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(content="Test response"))
         return mock_llm
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def agent(self, mock_settings, mock_llm):
-        """Create a PersonalAssistant instance for testing."""
-        with patch('src.core.agent.ChatGroq', return_value=mock_llm):
-            return PersonalAssistant()
+        """Create a PersonalAssistant instance shared by the module's tests."""
+        get_llm.cache_clear()
+        with patch('langchain_groq.ChatGroq', return_value=mock_llm):
+            yield PersonalAssistant()
+    
+    @pytest.fixture(autouse=True)
+    def reset_agent(self, agent, mock_llm):
+        """Reset conversation, memories and LLM failures after each test."""
+        yield
+        agent.flush_pending_writes()
+        agent.clear_conversation_memory()
+        # The in-memory Chroma store is shared across the test session
+        agent.memory_manager.clear_all_memories()
+        mock_llm.reset_mock(side_effect=True)
     
     def test_initialization(self, agent, mock_settings):
         """Test PersonalAssistant initialization."""
         assert agent.llm is not None
         assert agent.memory_manager is not None
-        assert agent.conversation_memory is not None
+        assert agent._chat_history is not None
         assert agent.system_prompt is not None
-        assert agent.prompt_template is not None
     
-    @pytest.mark.asyncio
+    def test_build_messages(self, agent):
+        """Test building the LLM message list."""
+        messages = agent._build_messages({
+            "input": "Hello",
+            "chat_history": [],
+            "memory_context": "User likes Python"
+        })
+        
+        assert len(messages) == 2
+        assert "User likes Python" in messages[0].content
+        assert "{memory_context}" not in messages[0].content
+        assert messages[-1].content == "Hello"
+    
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_chat_basic(self, agent):
         """Test basic chat functionality."""
         user_input = "Hello, how are you?"
@@ -59,9 +84,22 @@ class TestPersonalAssistant:
         response = await agent.chat(user_input)
         
         assert response == "Test response"
-        assert len(agent.conversation_memory.chat_memory.messages) == 2
+        assert len(agent._chat_history) == 2
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_chat_stream(self, agent):
+        """Test that a streamed reply is recorded once fully consumed."""
+        async def astream(messages):
+            for text in ["Test ", "", "response"]:
+                yield AIMessage(content=text)
+        agent.llm.astream = astream
+        
+        chunks = await agent.chat("Hello", stream=True)
+        
+        assert [chunk async for chunk in chunks] == ["Test ", "response"]
+        assert agent._chat_history[-1].content == "Test response"
+    
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_chat_with_memory_context(self, agent):
         """Test chat with memory context."""
         # Add some test memories
@@ -108,17 +146,17 @@ class TestPersonalAssistant:
     def test_clear_conversation_memory(self, agent):
         """Test clearing conversation memory."""
         # Add some messages
-        agent.conversation_memory.chat_memory.add_user_message("Test")
-        agent.conversation_memory.chat_memory.add_ai_message("Response")
+        agent._chat_history.append(HumanMessage(content="Test"))
+        agent._chat_history.append(AIMessage(content="Response"))
         
         # Verify messages exist
-        assert len(agent.conversation_memory.chat_memory.messages) == 2
+        assert len(agent._chat_history) == 2
         
         # Clear memory
         agent.clear_conversation_memory()
         
         # Verify memory is cleared
-        assert len(agent.conversation_memory.chat_memory.messages) == 0
+        assert len(agent._chat_history) == 0
     
     def test_get_conversation_summary(self, agent):
         """Test getting conversation summary."""
@@ -127,8 +165,8 @@ class TestPersonalAssistant:
         assert "No conversation history" in summary
         
         # Add some messages
-        agent.conversation_memory.chat_memory.add_user_message("Hello")
-        agent.conversation_memory.chat_memory.add_ai_message("Hi there!")
+        agent._chat_history.append(HumanMessage(content="Hello"))
+        agent._chat_history.append(AIMessage(content="Hi there!"))
         
         summary = agent.get_conversation_summary()
         assert "User messages: 1" in summary
@@ -146,7 +184,7 @@ class TestPersonalAssistant:
         assert success is True
         assert export_path.exists()
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="module")
     async def test_chat_error_handling(self, agent):
         """Test chat error handling."""
         # Mock LLM to raise an error
@@ -157,27 +195,37 @@ class TestPersonalAssistant:
         
         assert "I apologize, but I encountered an error" in response
     
-    def test_important_info_detection(self, agent):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_store_important_info(self, agent):
+        """Test that important information is written in the background."""
+        await agent._store_important_info("Remember that I like Python", "Noted!")
+        agent.flush_pending_writes()
+        
+        results = agent.search_memories("Python", n_results=1, memory_type="important_info")
+        
+        assert len(results) == 1
+        assert results[0][2]["explicitly_important"] is True
+    
+    @pytest.mark.parametrize("text", [
+        "Remember that I like Python",
+        "This is important information",
+        "Please save this preference",
+        "I always use Linux",
+        "My favorite color is blue"
+    ])
+    def test_important_info_detection(self, agent, text):
         """Test detection of important information."""
-        # Test with important keywords
-        important_inputs = [
-            "Remember that I like Python",
-            "This is important information",
-            "Please save this preference",
-            "I always use Linux",
-            "My favorite color is blue"
-        ]
-        
-        for user_input in important_inputs:
-            # Mock the memory manager to track calls
-            with patch.object(agent.memory_manager, 'add_memory') as mock_add:
-                # This would normally be called in the async context
-                # For testing, we'll call the method directly
-                pass
-        
-        # The actual test would verify that important information is stored
-        # This requires more complex mocking of the async context
-
+        assert agent._is_important(text) is True
+    
+    @pytest.mark.parametrize("text", [
+        "hello",
+        "what time is it",
+        # Whole words only, so "keyboard" does not match "key"
+        "What is the weather on my keyboard?"
+    ])
+    def test_unimportant_info_detection(self, agent, text):
+        """Test that ordinary messages are not flagged as important."""
+        assert agent._is_important(text) is False
 
 if __name__ == "__main__":
     pytest.main([__file__])
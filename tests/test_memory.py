@@ -2,12 +2,17 @@
 Tests for the memory management system.
 """
 
+import numpy as np
 import pytest
+import subprocess
+import sys
 import tempfile
+import uuid
 from pathlib import Path
 from datetime import datetime
 
-from src.core.memory import MemoryManager
+from src.core.config import settings
+from src.core.memory import MemoryManager, _QUESTION_RE
 
 
 class TestMemoryManager:
@@ -22,7 +27,10 @@ class TestMemoryManager:
     @pytest.fixture
     def memory_manager(self, temp_dir):
         """Create a MemoryManager instance for testing."""
-        return MemoryManager(temp_dir)
+        manager = MemoryManager(temp_dir)
+        yield manager
+        # The in-memory Chroma store is shared across the test session
+        manager.clear_all_memories()
     
     def test_initialization(self, memory_manager, temp_dir):
         """Test MemoryManager initialization."""
@@ -30,6 +38,44 @@ class TestMemoryManager:
         assert memory_manager.collection is not None
         assert memory_manager.embedding_model is not None
     
+    def test_embedding_model_shared(self, memory_manager, temp_dir):
+        """Test that managers share a single loaded embedding model."""
+        other = MemoryManager(temp_dir / "other")
+        
+        assert other.embedding_model is memory_manager.embedding_model
+    
+    def test_import_defers_heavy_dependencies(self):
+        """Test that importing the memory module loads neither torch nor chromadb."""
+        result = subprocess.run(
+            [
+                sys.executable, "-c",
+                "import sys, src.core.memory; "
+                "print(any(name in sys.modules for name in ('torch', 'sentence_transformers', 'chromadb')))"
+            ],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True
+        )
+        
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "False"
+    
+    @pytest.mark.smoke
+    def test_real_embedding_model(self):
+        """Test that the configured sentence-transformers model loads and encodes.
+        
+        Other tests use the fake embedder from conftest.py. Loading the real
+        model imports torch and may download weights, so this only runs with
+        `-m smoke`.
+        """
+        from sentence_transformers import SentenceTransformer
+        
+        model = SentenceTransformer(settings.memory_embedding_model)
+        
+        embeddings = model.encode(["Python", "Rust"], convert_to_numpy=True)
+        
+        assert embeddings.shape[0] == 2
+    
     def test_add_memory(self, memory_manager):
         """Test adding a memory entry."""
         content = "Test memory content"
@@ -51,13 +97,81 @@ class TestMemoryManager:
         assert retrieved[0] == content
         assert retrieved[1]["type"] == memory_type
         assert retrieved[1]["test_key"] == "test_value"
+        assert isinstance(retrieved[1]["timestamp"], int)
+    
+    def test_add_memories(self, memory_manager):
+        """Test adding several memory entries in one batch."""
+        contents = ["Batch memory one", "Batch memory two"]
+        
+        memory_ids = memory_manager.add_memories(
+            contents,
+            memory_types=["fact", "task"],
+            metadatas=[{"batch": True}, None]
+        )
+        
+        assert len(memory_ids) == 2
+        assert all(uuid.UUID(memory_id).version == 7 for memory_id in memory_ids)
+        for memory_id, content in zip(memory_ids, contents):
+            retrieved = memory_manager.get_memory_by_id(memory_id)
+            assert retrieved[0] == content
+        assert memory_manager.get_memory_by_id(memory_ids[0])[1]["batch"] is True
+        assert memory_manager.get_memory_by_id(memory_ids[1])[1]["type"] == "task"
+    
+    def test_add_conversation_memory(self, memory_manager):
+        """Test adding a conversation exchange."""
+        memory_id = memory_manager.add_conversation_memory(
+            "What is my favorite language?",
+            "Your favorite language is Python.",
+            conversation_id="conv-1"
+        )
+        
+        retrieved = memory_manager.get_memory_by_id(memory_id)
+        assert retrieved[0].startswith("User: What is my favorite language?")
+        assert retrieved[1]["type"] == "conversation"
+        assert retrieved[1]["conversation_id"] == "conv-1"
+    
+    def test_importance_score_keywords(self, memory_manager):
+        """Test that each distinct important keyword adds to the score."""
+        plain = memory_manager._calculate_importance_score("The sky is blue today", "other")
+        one = memory_manager._calculate_importance_score("Remember the sky is blue", "other")
+        repeated = memory_manager._calculate_importance_score("REMEMBER, remember the sky", "other")
+        two = memory_manager._calculate_importance_score("Remember my favorite sky", "other")
+        
+        assert plain == 0.5
+        assert one == repeated == 0.6
+        assert two == 0.7
+    
+    @pytest.mark.parametrize("text, score", [
+        # Plain inflections of a keyword still count, once per keyword
+        ("My preferences are set", 0.6),
+        ("I remembered it, remember?", 0.6),
+        ("She likes tea", 0.6),
+        # Longer words that merely contain a keyword do not
+        ("The keyboard is likely new", 0.5),
+        ("Check the notebook", 0.5),
+    ])
+    def test_importance_score_inflected_keywords(self, memory_manager, text, score):
+        """Test that keywords match as whole words with plain inflections."""
+        assert memory_manager._calculate_importance_score(text, "other") == score
+    
+    @pytest.mark.parametrize("text, is_question", [
+        ("How do I reset it?", True),
+        ("Can you explain decorators", True),
+        ("Thanks for helping", True),
+        ("Show me the logs", False),
+        ("Whenever it rains", False),
+    ])
+    def test_question_phrases_match_whole_words(self, text, is_question):
+        """Test that question phrases follow the same whole-word rule as keywords."""
+        assert (_QUESTION_RE.search(text) is not None) is is_question
     
     def test_search_memory(self, memory_manager):
         """Test memory search functionality."""
         # Add test memories
-        memory_manager.add_memory("Python programming language", "fact")
-        memory_manager.add_memory("Machine learning algorithms", "fact")
-        memory_manager.add_memory("Data science projects", "project")
+        memory_manager.add_memories(
+            ["Python programming language", "Machine learning algorithms", "Data science projects"],
+            memory_types=["fact", "fact", "project"]
+        )
         
         # Search for relevant memories
         results = memory_manager.search_memory("Python", n_results=2)
@@ -65,6 +179,87 @@ class TestMemoryManager:
         assert len(results) > 0
         assert any("Python" in result[0] for result in results)
     
+    def test_query_embedding_cache(self, memory_manager):
+        """Test that repeated queries reuse the cached embedding."""
+        first = memory_manager._encode_query("Python")
+        
+        # The fake embedder is uncased, so case and padding share one entry
+        assert np.array_equal(memory_manager._encode_query("  python "), first)
+        
+        stats = memory_manager.get_performance_stats()
+        assert stats["query_embedding_cache"]["hits"] == 1
+        assert stats["query_embedding_cache"]["misses"] == 1
+        # The in-memory backend writes nothing to disk
+        assert memory_manager._embed_cache is None
+        assert stats["disk_embedding_cache_entries"] == 0
+    
+    def test_search_memory_min_score(self, memory_manager):
+        """Test that weak matches are dropped by min_score."""
+        memory_manager.add_memory("Python programming language", "fact")
+        
+        all_results = memory_manager.search_memory("Python", n_results=5)
+        top_score = all_results[0][1]
+        
+        assert memory_manager.search_memory("Python", n_results=5, min_score=top_score + 0.01) == []
+        assert len(memory_manager.search_memory("Python", n_results=5, min_score=top_score)) >= 1
+    
+    def test_search_memory_combined_filters(self, memory_manager):
+        """Test searching with several filters and without re-ranking."""
+        memory_manager.add_memories(
+            ["Python programming language", "Python snake species", "Python conversation"],
+            memory_types=["fact", "fact", "conversation"],
+            importance_scores=[0.9, 0.2, 0.9]
+        )
+        
+        results = memory_manager.search_memory(
+            "Python", n_results=5, memory_type="fact", min_importance=0.5
+        )
+        assert len(results) == 1
+        assert results[0][0] == "Python programming language"
+        
+        unranked = memory_manager.search_memory("Python", n_results=2, rerank=False)
+        assert len(unranked) == 2
+    
+    def test_search_memory_semantic_cache(self, memory_manager):
+        """Test that repeated searches are served from cache until a write."""
+        memory_manager.add_memory("Python programming language", "fact")
+        
+        first = memory_manager.search_memory("Python", n_results=2)
+        assert len(memory_manager._sem_cache) == 1
+        
+        assert memory_manager.search_memory("python", n_results=2) == first
+        assert len(memory_manager._sem_cache) == 1
+        
+        # Edits to returned metadata do not leak into later cache hits
+        first[0][2]["type"] = "edited"
+        assert memory_manager.search_memory("Python", n_results=2)[0][2]["type"] == "fact"
+        
+        memory_manager.add_memory("Rust programming language", "fact")
+        assert len(memory_manager._sem_cache) == 0
+    
+    def test_long_memory_summary_precomputed(self, memory_manager):
+        """Test that long memories store their summary at write time."""
+        content = "Python is my favorite language. " + "It has many libraries. " * 10
+        
+        memory_id = memory_manager.add_memory(content, "fact")
+        
+        metadata = memory_manager.get_memory_by_id(memory_id)[1]
+        assert metadata["summary"] == "Python is my favorite language."
+        assert memory_manager.backfill_summaries() == 0
+    
+    def test_build_context(self, memory_manager):
+        """Test building context from search results by importance."""
+        memories = [
+            ("Minor detail", 0.9, {"type": "fact", "importance_score": 0.4}),
+            ("Key preference", 0.5, {"type": "preference", "importance_score": 0.9}),
+        ]
+        
+        context = memory_manager.build_context(memories, max_tokens=100)
+        
+        assert context.startswith("Relevant context from 2 memories")
+        assert context.index("Key preference") < context.index("Minor detail")
+        assert memory_manager.build_context([]) == ""
+    
     def test_update_memory(self, memory_manager):
         """Test updating an existing memory."""
         # Add initial memory
@@ -103,9 +298,10 @@ class TestMemoryManager:
     def test_get_memory_stats(self, memory_manager):
         """Test getting memory statistics."""
         # Add some memories
-        memory_manager.add_memory("Test 1", "type1")
-        memory_manager.add_memory("Test 2", "type2")
-        memory_manager.add_memory("Test 3", "type1")
+        memory_manager.add_memories(
+            ["Test 1", "Test 2", "Test 3"],
+            memory_types=["type1", "type2", "type1"]
+        )
         
         stats = memory_manager.get_memory_stats()
         
@@ -115,11 +311,20 @@ class TestMemoryManager:
         assert "type1" in stats["type_distribution"]
         assert "type2" in stats["type_distribution"]
     
+    def test_memory_stats_cache_invalidated_on_write(self, memory_manager):
+        """Test that cached statistics are refreshed after a write."""
+        stats_before = memory_manager.get_memory_stats()
+        assert memory_manager.get_memory_stats() is stats_before
+        
+        memory_manager.add_memory("Fresh memory", "fact")
+        
+        stats_after = memory_manager.get_memory_stats()
+        assert stats_after["total_memories"] == stats_before["total_memories"] + 1
+    
     def test_export_memories(self, memory_manager, temp_dir):
         """Test exporting memories to file."""
         # Add test memories
-        memory_manager.add_memory("Export test 1", "export")
-        memory_manager.add_memory("Export test 2", "export")
+        memory_manager.add_memories(["Export test 1", "Export test 2"], memory_types=["export"] * 2)
         
         # Export to file
         export_path = temp_dir / "export_test.json"
@@ -135,12 +340,37 @@ class TestMemoryManager:
         
         assert "memories" in export_data
         assert len(export_data["memories"]) >= 2
+        assert export_data["total_memories"] == len(export_data["memories"])
+        # Timestamps are exported as ISO 8601 strings
+        datetime.fromisoformat(export_data["memories"][0]["metadata"]["timestamp"])
+    
+    def test_backfill_iso_timestamps(self, memory_manager, temp_dir):
+        """Test that ISO timestamps from older stores export and convert to nanoseconds."""
+        memory_id = memory_manager.add_memory("Legacy memory", "fact")
+        metadata = memory_manager.get_memory_by_id(memory_id)[1]
+        memory_manager.collection.update(
+            ids=[memory_id],
+            metadatas=[{**metadata, "timestamp": "2024-05-01T12:30:00.250000"}]
+        )
+        
+        # Unmigrated records still export their ISO string as is
+        export_path = temp_dir / "legacy_export.json"
+        assert memory_manager.export_memories(export_path) is True
+        import json
+        with open(export_path, 'r') as f:
+            exported = json.load(f)["memories"][0]["metadata"]
+        assert exported["timestamp"] == "2024-05-01T12:30:00.250000"
+        
+        assert memory_manager.backfill_timestamps() == 1
+        timestamp = memory_manager.get_memory_by_id(memory_id)[1]["timestamp"]
+        assert isinstance(timestamp, int)
+        assert datetime.fromtimestamp(timestamp / 1_000_000_000) == datetime(2024, 5, 1, 12, 30, 0, 250000)
+        assert memory_manager.backfill_timestamps() == 0
     
     def test_clear_all_memories(self, memory_manager):
         """Test clearing all memories."""
         # Add some memories
-        memory_manager.add_memory("Test 1", "clear")
-        memory_manager.add_memory("Test 2", "clear")
+        memory_manager.add_memories(["Test 1", "Test 2"], memory_types=["clear"] * 2)
         
         # Verify they exist
         stats_before = memory_manager.get_memory_stats()
@@ -153,6 +383,11 @@ class TestMemoryManager:
         # Verify they're gone
         stats_after = memory_manager.get_memory_stats()
         assert stats_after["total_memories"] == 0
+        
+        # The recreated collection keeps its index configuration and accepts writes
+        assert memory_manager.collection.metadata["hnsw:space"] == "cosine"
+        memory_manager.add_memory("Test 3", "clear")
+        assert memory_manager.get_memory_stats()["total_memories"] == 1
 
 
 if __name__ == "__main__":